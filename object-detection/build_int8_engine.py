@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Build an INT8 TensorRT engine for the object detection server
+
+Collects representative frames from CALIB_DIR, writes the Ultralytics dataset
+YAML used for INT8 calibration, and exports the engine into MODEL_CACHE_DIR
+under the name the server looks for. Run it on the same GPU type as the
+deployment (engines are architecture specific), then ship or mount the engine.
+
+Calibration frames should match deployment conditions (camera angles,
+lighting, resolutions); a few hundred JPEGs is enough.
+
+Usage:
+    CALIB_DIR=/data/calib MODEL_CACHE_DIR=/data/models python build_int8_engine.py
+"""
+
+import glob
+import os
+import shutil
+import sys
+
+import torch
+from ultralytics import YOLO
+
+MODEL_WEIGHTS = os.getenv('MODEL_WEIGHTS', 'yolo12n.pt')
+ENGINE_IMGSZ = 640
+CALIB_DIR = os.getenv('CALIB_DIR', './calib')
+MODEL_CACHE_DIR = os.getenv('MODEL_CACHE_DIR', '.')
+MAX_BATCH = int(os.getenv('MAX_BATCH', '16'))
+
+
+def write_calibration_yaml(calib_dir, names):
+    """
+    Write an Ultralytics dataset YAML pointing at the calibration frames
+
+    Args:
+        calib_dir (str): Directory with calibration JPEGs
+        names (dict): Class id to name mapping from the model
+
+    Returns:
+        str: Path to the written YAML
+    """
+    yaml_path = os.path.join(calib_dir, 'calib.yaml')
+    with open(yaml_path, 'w') as f:
+        f.write(f"path: {os.path.abspath(calib_dir)}\n")
+        f.write("train: .\n")
+        f.write("val: .\n")
+        f.write("names:\n")
+        for class_id in sorted(names):
+            f.write(f"  {class_id}: {names[class_id]}\n")
+    return yaml_path
+
+
+def main():
+    if not torch.cuda.is_available():
+        print("[ERROR] A CUDA GPU is required to build a TensorRT engine")
+        return 1
+
+    capability = torch.cuda.get_device_capability()
+    if capability < (7, 5):
+        print(f"[ERROR] GPU compute capability {capability} < 7.5 has no fast INT8 path, use the FP16 engine")
+        return 1
+
+    frames = glob.glob(os.path.join(CALIB_DIR, '*.jpg')) + glob.glob(os.path.join(CALIB_DIR, '*.jpeg'))
+    if not frames:
+        print(f"[ERROR] No calibration JPEGs found in {CALIB_DIR}")
+        return 1
+    print(f"[INFO] Calibrating on {len(frames)} frames from {CALIB_DIR}")
+
+    model = YOLO(MODEL_WEIGHTS)
+    yaml_path = write_calibration_yaml(CALIB_DIR, model.names)
+
+    exported_path = model.export(
+        format='engine',
+        imgsz=ENGINE_IMGSZ,
+        int8=True,
+        data=yaml_path,
+        dynamic=True,
+        batch=MAX_BATCH,
+        workspace=4
+    )
+
+    # Same naming scheme as engine_cache_path() in src/server.py
+    stem = os.path.splitext(os.path.basename(MODEL_WEIGHTS))[0]
+    engine_name = f"{stem}-int8-b{MAX_BATCH}-sm{capability[0]}{capability[1]}.engine"
+    engine_path = os.path.join(MODEL_CACHE_DIR, engine_name)
+    os.makedirs(MODEL_CACHE_DIR, exist_ok=True)
+    shutil.move(exported_path, engine_path)
+
+    print(f"[INFO] INT8 engine written to {engine_path}")
+    print(f"[INFO] Start the server with USE_INT8=true and MODEL_CACHE_DIR={MODEL_CACHE_DIR}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
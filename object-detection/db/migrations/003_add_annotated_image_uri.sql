@@ -0,0 +1,8 @@
+-- Add annotated_image_uri column for IMAGE_STORE_DIR deployments
+-- Migration: 003_add_annotated_image_uri.sql
+
+-- Path of the annotated image file when images are stored on disk instead of in annotated_image
+ALTER TABLE detection_results
+ADD COLUMN IF NOT EXISTS annotated_image_uri VARCHAR(512);
+
+COMMENT ON COLUMN detection_results.annotated_image_uri IS 'Annotated image path under IMAGE_STORE_DIR: <dir>/<resolution>/<indexed_filename>';
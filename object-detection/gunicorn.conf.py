@@ -0,0 +1,44 @@
+"""
+Gunicorn configuration for the Object Detection Server
+
+A single worker keeps one YOLO model (and one CUDA context) in memory, while
+gthread worker threads overlap decode, JSON and network I/O with inference.
+"""
+
+import os
+import subprocess
+import sys
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+pythonpath = 'src'
+
+worker_class = 'gthread'
+workers = int(os.getenv('GUNICORN_WORKERS', '1'))
+threads = int(os.getenv('GUNICORN_THREADS', '8'))
+
+# Load the model in each worker after fork: CUDA contexts and TensorRT engines
+# created in the master are not usable in forked children
+preload_app = False
+
+# A worker does not heartbeat while it loads the app; the model export already
+# ran in on_starting, so this only covers loading the cached model and warm-up.
+# With USE_CUDA_GRAPH the warm-up also runs torch.compile and captures a CUDA graph
+# per batch size (minutes), so that mode gets a longer default
+_cuda_graph = os.getenv('USE_CUDA_GRAPH', 'false').lower() == 'true'
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '600' if _cuda_graph else '120'))
+accesslog = '-'
+
+
+def on_starting(server):
+    # Export the TensorRT engine / OpenVINO model into MODEL_CACHE_DIR before any
+    # worker starts. It runs in a child process so the master never creates a CUDA
+    # context (forked workers could not use it), and the worker then loads the cache
+    config_dir = os.path.dirname(os.path.abspath(__file__))
+    subprocess.run([sys.executable, os.path.join(config_dir, 'prepare_model.py')], check=True)
+
+
+def post_worker_init(worker):
+    # Runs after the worker loaded the app: warm up inference before it accepts
+    # connections, so the first request does not pay CUDA/cuDNN/TensorRT initialisation
+    import server
+    server.inference_batcher.warm_up()
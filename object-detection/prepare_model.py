@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Export and cache the inference model before the server starts serving
+
+Importing the server runs load_model(), which exports the TensorRT engine
+(GPU nodes) or OpenVINO model (CPU nodes) into MODEL_CACHE_DIR unless it is
+already cached there. Gunicorn runs this in a separate process before forking
+its workers (see on_starting in gunicorn.conf.py), so the minutes-long first
+export never counts against the worker timeout; it can also be run ahead of
+time on the target GPU type to fill a shared MODEL_CACHE_DIR volume.
+
+Usage:
+    MODEL_CACHE_DIR=/data/models python prepare_model.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+
+def main():
+    # load_model() runs at import and caches the exported model
+    import server  # noqa: F401
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
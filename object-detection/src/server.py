@@ -3,31 +3,98 @@ Object Detection Server for Video Processing Pipeline
 Uses YOLO12 for real-time object detection on video frames
 """
 
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Request, Response, request
+from werkzeug.exceptions import RequestEntityTooLarge
 from flask_cors import CORS, cross_origin
 from flask_sqlalchemy import SQLAlchemy
 import cv2
 import numpy as np
+import torch
+import torch.nn.functional as F
+from torchvision.io import ImageReadMode, decode_jpeg
 from ultralytics import YOLO
+from ultralytics.cfg import DEFAULT_CFG_DICT
+from ultralytics.data.augment import LetterBox
+from ultralytics.utils import ops
+from ultralytics.utils.plotting import colors
+import orjson
 import requests
-import base64
+from requests.adapters import HTTPAdapter
 import os
 import io
 import re
+import shutil
 import threading
 import uuid
 import time
-from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import queue
+import itertools
+from datetime import datetime, timedelta
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, as_completed
+
+# libjpeg-turbo bindings are optional; OpenCV's JPEG encoder is used without them
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR
+    turbo_jpeg = TurboJPEG()
+except Exception:
+    turbo_jpeg = None
+
+# pybase64 (SIMD libbase64) is optional; it mirrors the stdlib base64 API used here
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
+
+# Numpy values serialize natively; non-string keys (the integer class ids in model.names) are stringified
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+class InMemoryUploadRequest(Request):
+    """Flask request that keeps file uploads in memory instead of spooling parts over 500KB to disk"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        # Bodies are capped by MAX_CONTENT_LENGTH; a BytesIO lets read_upload() hand out a zero-copy view
+        return io.BytesIO()
 
 app = Flask(__name__)
+app.request_class = InMemoryUploadRequest
 CORS(app)
 
+def json_response(payload, status=200):
+    """
+    Serialize a response payload with orjson
+
+    Numpy scalars and arrays are serialized natively, so callers do not need
+    to cast detection values to Python floats first. Non-string keys (the
+    integer class ids in model.names) are stringified like the stdlib encoder.
+
+    Args:
+        payload: JSON-serializable object
+        status (int): HTTP status code
+
+    Returns:
+        Response: application/json response
+    """
+    return Response(orjson.dumps(payload, option=ORJSON_OPTIONS), status=status, mimetype='application/json')
+
 # Database storage configuration (disabled by default)
 ENABLE_DB_STORAGE = os.getenv('ENABLE_DB_STORAGE', 'false').lower() == 'true'
-
-# Use SQLite in-memory as dummy DB when database is disabled (no PostgreSQL connection needed)
-# This satisfies flask-sqlalchemy without requiring psycopg2 or a real database
+# Rows are written by a background thread: up to DB_WRITE_BATCH rows per INSERT/commit, collected
+# for at most DB_WRITE_LINGER_MS, and at most DB_WRITE_QUEUE pending writes before request threads
+# write synchronously
+DB_WRITE_BATCH = int(os.getenv('DB_WRITE_BATCH', '32'))
+DB_WRITE_LINGER_MS = float(os.getenv('DB_WRITE_LINGER_MS', '200'))
+DB_WRITE_QUEUE = int(os.getenv('DB_WRITE_QUEUE', '256'))
+# When set, annotated images are written under this directory (a mounted volume) by the writer
+# thread and rows keep only the file path in annotated_image_uri instead of the image bytes
+IMAGE_STORE_DIR = os.getenv('IMAGE_STORE_DIR', '')
+# Rows (and stored image files) older than this are deleted by the writer thread every
+# DB_PRUNE_INTERVAL_S, DB_PRUNE_BATCH rows per transaction; 0 keeps everything
+DB_RETENTION_HOURS = float(os.getenv('DB_RETENTION_HOURS', '0'))
+DB_PRUNE_INTERVAL_S = 600
+DB_PRUNE_BATCH = 5000
+
+# Flask-SQLAlchemy is only set up when storage is enabled; otherwise db and DetectionResult
+# are None and no engine, session or per-request teardown exists at all
 if ENABLE_DB_STORAGE:
     from urllib.parse import quote_plus
     db_user = os.environ.get('DB_USER', 'postgres')
@@ -35,28 +102,194 @@ if ENABLE_DB_STORAGE:
     db_host = os.environ.get('DB_HOST', 'postgres-svc')
     db_port = os.environ.get('DB_PORT', '5432')
     db_name = os.environ.get('DB_NAME', 'postgres')
-    DATABASE_URI = f"postgresql://{quote_plus(db_user)}:{quote_plus(db_pass)}@{db_host}:{db_port}/{db_name}"
+    DATABASE_URI = f"postgresql+psycopg2://{quote_plus(db_user)}:{quote_plus(db_pass)}@{db_host}:{db_port}/{db_name}"
     print("[INFO] Database storage is ENABLED - connecting to PostgreSQL")
+
+    app.config['SQLALCHEMY_DATABASE_URI'] = DATABASE_URI
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Encode the detections JSON column with orjson instead of the stdlib json module
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'json_serializer': lambda obj: orjson.dumps(obj, option=ORJSON_OPTIONS).decode()
+    }
+
+    # The server only inserts rows: skip autoflush and post-commit expiry (no reload of just-written records)
+    db = SQLAlchemy(app, session_options={'autoflush': False, 'expire_on_commit': False})
 else:
-    DATABASE_URI = "sqlite:///:memory:"
-    print("[INFO] Database storage is DISABLED - using in-memory SQLite (no DB operations)")
+    db = None
+    print("[INFO] Database storage is DISABLED - SQLAlchemy not initialised")
+
+
+# Model configuration
+# yolo12n.pt is the nano version (fastest). For INT8 deployments prefer an NMS-free
+# head such as yolo26n.pt: it has no DFL/NMS ops that quantize poorly and skips NMS
+MODEL_WEIGHTS = os.getenv('MODEL_WEIGHTS', 'yolo12n.pt')
+USE_TENSORRT = os.getenv('USE_TENSORRT', 'true').lower() == 'true'
+MODEL_CACHE_DIR = os.getenv('MODEL_CACHE_DIR', '.')  # Mount a volume here to keep the engine across restarts
+MAX_BATCH = int(os.getenv('MAX_BATCH', '16'))
+ENGINE_IMGSZ = 640
+# Numeric precision: 'fp32', 'fp16' or 'int8'; unset picks the fastest the GPU supports (FP16 on Volta+)
+PRECISION = os.getenv('PRECISION', '').lower()
+# FP16 on Pascal (SM 6.x) is slower than FP32, so half precision needs Volta+
+FP16_MIN_CAPABILITY = (7, 0)
+# INT8 engine: loaded prebuilt from MODEL_CACHE_DIR (see build_int8_engine.py) or calibrated on INT8_CALIB_DATA
+INT8_CALIB_DATA = os.getenv('INT8_CALIB_DATA', '')
+USE_INT8 = os.getenv('USE_INT8', 'false').lower() == 'true' or bool(INT8_CALIB_DATA) or PRECISION == 'int8'
+# CPU-only hosts: run an OpenVINO export instead of the PyTorch weights
+USE_OPENVINO = os.getenv('USE_OPENVINO', 'true').lower() == 'true'
+
+
+def engine_cache_path(precision, capability):
+    """
+    Path of the cached TensorRT engine for a precision and GPU architecture
+
+    Engines are tuned for one GPU architecture and batch profile, so both are
+    part of the name and a shared MODEL_CACHE_DIR never hands a node an engine
+    built for different hardware (e.g. yolo12n-fp16-b16-sm86.engine).
 
-app.config['SQLALCHEMY_DATABASE_URI'] = DATABASE_URI
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    Args:
+        precision (str): 'fp32', 'fp16' or 'int8'
+        capability (tuple): CUDA compute capability (major, minor)
 
-db = SQLAlchemy(app)
+    Returns:
+        str: Engine path inside MODEL_CACHE_DIR
+    """
+    stem = os.path.splitext(os.path.basename(MODEL_WEIGHTS))[0]
+    engine_name = f"{stem}-{precision}-b{MAX_BATCH}-sm{capability[0]}{capability[1]}.engine"
+    return os.path.join(MODEL_CACHE_DIR, engine_name)
+
+
+def cpu_supports_vnni():
+    """Check /proc/cpuinfo for AVX-VNNI / AVX512-VNNI (INT8 only beats FP32 on CPUs with them)"""
+    try:
+        with open('/proc/cpuinfo') as f:
+            flags = f.read()
+    except OSError:
+        return False
+    return 'avx512_vnni' in flags or 'avx_vnni' in flags
+
+def load_openvino_model():
+    """
+    Load YOLO12 as an OpenVINO model for CPU-only hosts
+
+    The .pt weights are exported once (dynamic batch, ENGINE_IMGSZ input) and
+    cached in MODEL_CACHE_DIR. INT8 is used when USE_INT8 is set with
+    INT8_CALIB_DATA and the CPU has VNNI; FP32 otherwise. A failed export
+    falls back to the PyTorch weights.
+
+    Returns:
+        YOLO: Loaded model
+    """
+    int8 = USE_INT8 and bool(INT8_CALIB_DATA)
+    if int8 and not cpu_supports_vnni():
+        print("[INFO] CPU lacks VNNI, using an FP32 OpenVINO model instead of INT8")
+        int8 = False
+
+    # Ultralytics recognises OpenVINO models by the _openvino_model directory suffix
+    stem = os.path.splitext(os.path.basename(MODEL_WEIGHTS))[0]
+    model_dir = os.path.join(MODEL_CACHE_DIR, f"{stem}-{'int8' if int8 else 'fp32'}_openvino_model")
+
+    if not os.path.exists(model_dir):
+        print(f"[INFO] Exporting OpenVINO model (int8={int8}), this runs once...")
+        try:
+            export_args = {}
+            if int8:
+                export_args = {'int8': True, 'data': INT8_CALIB_DATA}
+            exported_path = YOLO(MODEL_WEIGHTS).export(
+                format='openvino',
+                imgsz=ENGINE_IMGSZ,
+                dynamic=True,
+                **export_args
+            )
+            os.makedirs(MODEL_CACHE_DIR, exist_ok=True)
+            if os.path.abspath(exported_path) != os.path.abspath(model_dir):
+                shutil.move(exported_path, model_dir)
+        except Exception as e:
+            print(f"[WARN] OpenVINO export failed, falling back to PyTorch weights: {e}")
+            return YOLO(MODEL_WEIGHTS)
+
+    print(f"[INFO] Loading OpenVINO model: {model_dir}")
+    return YOLO(model_dir, task='detect')
+
+def load_model():
+    """
+    Load YOLO12 model, preferring a cached TensorRT engine on CUDA hosts
+
+    On GPU nodes the .pt weights are exported once to a TensorRT engine
+    (FP16 on compute capability >= 7.0, dynamic batch up to MAX_BATCH) and
+    cached in MODEL_CACHE_DIR, so pod restarts skip the export step.
+    With USE_INT8 an INT8 engine is used instead on GPUs with fast INT8
+    (compute capability >= 7.5): a prebuilt one from build_int8_engine.py,
+    or one calibrated here on INT8_CALIB_DATA.
+    CPU-only nodes use an OpenVINO export (see load_openvino_model), and
+    failed exports fall back to the PyTorch weights.
+
+    Returns:
+        YOLO: Loaded model
+    """
+    if not torch.cuda.is_available():
+        return load_openvino_model() if USE_OPENVINO else YOLO(MODEL_WEIGHTS)
+
+    if not USE_TENSORRT:
+        return YOLO(MODEL_WEIGHTS)
+
+    capability = torch.cuda.get_device_capability()
+    int8 = USE_INT8
+    if int8 and capability < (7, 5):
+        # Volta and older lack INT8 tensor cores, so the calibrated engine is no faster there
+        print(f"[WARN] INT8 engine requested but GPU compute capability {capability} < 7.5, using FP16")
+        int8 = False
+    if int8 and not INT8_CALIB_DATA and not os.path.exists(engine_cache_path('int8', capability)):
+        print(f"[WARN] No prebuilt INT8 engine at {engine_cache_path('int8', capability)} and INT8_CALIB_DATA unset, using FP16")
+        int8 = False
+
+    half = not int8 and capability >= FP16_MIN_CAPABILITY and PRECISION != 'fp32'
+    precision = 'int8' if int8 else 'fp16' if half else 'fp32'
+    engine_path = engine_cache_path(precision, capability)
+
+    if not os.path.exists(engine_path):
+        print(f"[INFO] Exporting TensorRT engine (half={half}, int8={int8}, batch={MAX_BATCH}), this runs once...")
+        try:
+            export_args = {}
+            if int8:
+                export_args = {'int8': True, 'data': INT8_CALIB_DATA}
+            exported_path = YOLO(MODEL_WEIGHTS).export(
+                format='engine',
+                imgsz=ENGINE_IMGSZ,
+                half=half,
+                dynamic=True,
+                batch=MAX_BATCH,
+                workspace=4,
+                **export_args
+            )
+            os.makedirs(MODEL_CACHE_DIR, exist_ok=True)
+            if os.path.abspath(exported_path) != os.path.abspath(engine_path):
+                shutil.move(exported_path, engine_path)
+        except Exception as e:
+            print(f"[WARN] TensorRT export failed, falling back to PyTorch weights: {e}")
+            return YOLO(MODEL_WEIGHTS)
+
+    print(f"[INFO] Loading TensorRT engine: {engine_path}")
+    return YOLO(engine_path, task='detect')
 
 
 # Load YOLO12 model (using nano version for efficiency)
 # Model will be downloaded automatically on first run
 print("Loading YOLO12 model...")
-model = YOLO('yolo12n.pt')  # yolo12n.pt is the nano version (fastest)
+model = load_model()
 print("Model loaded successfully!")
 
+# Class names as a list indexed by class id (cheaper than the model.names dict lookup per box)
+CLASS_NAMES = [model.names[i] for i in sorted(model.names)]
+# Per-class BGR box colors (Ultralytics palette), resolved once instead of per box
+CLASS_COLORS = [colors(i, True) for i in range(len(CLASS_NAMES))]
+
 # Configuration
 CONFIDENCE_THRESHOLD = float(os.getenv('CONFIDENCE_THRESHOLD', '0.25'))
 IOU_THRESHOLD = float(os.getenv('IOU_THRESHOLD', '0.45'))
 MAX_DETECTIONS = int(os.getenv('MAX_DETECTIONS', '300'))
+# Detection layout: a list of per-box dicts with a 'dict' ({x1, y1, x2, y2}) or the smaller, faster-to-encode
+# 'list' ([x1, y1, x2, y2]) bbox, or 'columns': one object of parallel arrays (no per-box dicts at all)
+BBOX_FORMAT = os.getenv('BBOX_FORMAT', 'dict').lower()
 
 # Outputstreaming configuration - resolution-specific endpoints
 OUTPUTSTREAMING_URL_256P = os.getenv('OUTPUTSTREAMING_URL_256P')
@@ -75,6 +308,45 @@ OUTPUTSTREAMING_URLS = {
 
 SEND_TO_OUTPUTSTREAMING = os.getenv('SEND_TO_OUTPUTSTREAMING', 'true').lower() == 'true'
 
+# Print per-request/per-frame progress ([DEBUG]/[INFO]/[PERF] lines); warnings and errors are always
+# printed. Off by default: with PYTHONUNBUFFERED every print is a write() on the request thread
+VERBOSE_LOGGING = os.getenv('VERBOSE_LOGGING', 'false').lower() == 'true'
+
+# JPEG quality for annotated frames sent to outputstreaming
+JPEG_QUALITY = int(os.getenv('JPEG_QUALITY', '85'))
+
+# Encoding of annotated frames stored by /detect/batch: 'jpeg' (libjpeg-turbo, a few ms per
+# 1080p frame) or 'png' (lossless, but zlib costs tens of ms per frame)
+STORED_IMAGE_FORMAT = os.getenv('STORED_IMAGE_FORMAT', 'jpeg').lower()
+
+# Default encoding of the annotated image returned by /detect/<resolution> ('png' or 'jpeg');
+# a request's ?format= overrides it
+OUTPUT_FORMAT = os.getenv('OUTPUT_FORMAT', 'png').lower()
+
+# Outputstreaming frame payload: 'json' (base64 JPEG in a JSON body), 'jpeg' (raw JPEG body, metadata in headers)
+# or 'multipart' (JPEG file part plus topic/resolution form fields)
+OUTPUTSTREAMING_PAYLOAD = os.getenv('OUTPUTSTREAMING_PAYLOAD', 'json').lower()
+
+# Outputstreaming sends run in the background; frames are dropped when the backlog is full
+OUTPUTSTREAMING_WORKERS = int(os.getenv('OUTPUTSTREAMING_WORKERS', '4'))
+OUTPUTSTREAMING_MAX_PENDING = int(os.getenv('OUTPUTSTREAMING_MAX_PENDING', '16'))
+outputstreaming_executor = ThreadPoolExecutor(
+    max_workers=OUTPUTSTREAMING_WORKERS,
+    thread_name_prefix='outputstreaming'
+)
+outputstreaming_slots = threading.BoundedSemaphore(OUTPUTSTREAMING_MAX_PENDING)
+
+# Shared keep-alive session so frame POSTs reuse TCP connections instead of reconnecting per frame
+outputstreaming_session = requests.Session()
+outputstreaming_session.headers['Connection'] = 'keep-alive'
+outputstreaming_adapter = HTTPAdapter(
+    pool_connections=len(OUTPUTSTREAMING_URLS),
+    pool_maxsize=OUTPUTSTREAMING_WORKERS,
+    max_retries=0
+)
+outputstreaming_session.mount('http://', outputstreaming_adapter)
+outputstreaming_session.mount('https://', outputstreaming_adapter)
+
 # Log outputstreaming configuration on startup
 if SEND_TO_OUTPUTSTREAMING:
     print("[INFO] Outputstreaming endpoints configured:")
@@ -88,31 +360,97 @@ RESOLUTIONS = {
     '1080p': (1920, 1080)
 }
 
-# Image counter for indexed filenames (thread-safe)
-image_counter = 0
-counter_lock = threading.Lock()
-
-# YOLO model lock for thread-safe inference (Phase 1C)
-model_lock = threading.Lock()
+# Image counter for indexed filenames; next() on itertools.count is atomic under the GIL, so no lock
+image_counter = itertools.count(1)
+MAX_IMAGE_INDEX = 999999  # 6-digit format
+
+# Micro-batching: concurrent inference requests are coalesced for up to BATCH_TIMEOUT_MS
+# into a single forward pass of at most MAX_BATCH images
+BATCH_TIMEOUT_MS = float(os.getenv('BATCH_TIMEOUT_MS', '5'))
+# Upper bound a request thread waits for its inference results before failing the request
+INFERENCE_TIMEOUT_S = float(os.getenv('INFERENCE_TIMEOUT_S', '30'))
+
+# The resolution files of a /detect/batch request are decoded in parallel
+# (libjpeg-turbo, libpng and OpenCV release the GIL while decoding)
+DECODE_WORKERS = int(os.getenv('DECODE_WORKERS', str(min(os.cpu_count() or 1, 8))))
+decode_executor = ThreadPoolExecutor(max_workers=DECODE_WORKERS, thread_name_prefix='decode')
+# Shared pool for the per-resolution annotate/encode/forward stage (one worker per resolution),
+# created once instead of spawning three threads per request
+postprocess_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix='postprocess')
+
+# Decode JPEG uploads on the GPU with nvJPEG (CUDA hosts only)
+GPU_JPEG_DECODE = os.getenv('GPU_JPEG_DECODE', 'true').lower() == 'true' and torch.cuda.is_available()
+
+# Upload letterboxed frames through a reusable pinned-memory staging buffer (CUDA hosts only)
+PINNED_UPLOAD = os.getenv('PINNED_UPLOAD', 'true').lower() == 'true' and torch.cuda.is_available()
+
+# Upload raw uint8 frames and letterbox/normalize them on the GPU instead of the CPU (CUDA hosts only)
+GPU_LETTERBOX = os.getenv('GPU_LETTERBOX', 'false').lower() == 'true' and torch.cuda.is_available()
+
+# Replay the PyTorch model's GPU forward from CUDA graphs (torch.compile 'reduce-overhead');
+# not used with TensorRT engines
+USE_CUDA_GRAPH = os.getenv('USE_CUDA_GRAPH', 'false').lower() == 'true' and torch.cuda.is_available()
+
+# Give up on the startup warm-up after this long, so a hung inference thread is reported
+# before Gunicorn's worker timeout (120s, 600s with USE_CUDA_GRAPH) kills the worker silently
+WARMUP_TIMEOUT_S = float(os.getenv('WARMUP_TIMEOUT_S', '540' if USE_CUDA_GRAPH else '90'))
+
+# Run the PyTorch model in FP16 with channels_last activations (Tensor Cores) on Volta+ GPUs,
+# same capability rule as the TensorRT engine; TensorRT engines carry their own precision
+HALF_PRECISION = (
+    os.getenv('HALF_PRECISION', 'true').lower() == 'true'
+    and PRECISION != 'fp32'
+    and torch.cuda.is_available()
+    and torch.cuda.get_device_capability() >= FP16_MIN_CAPABILITY
+)
 
 # Pod-specific prefix for distributed deployments
 IMAGE_INDEX_PREFIX = os.getenv('IMAGE_INDEX_PREFIX', 'pod')
+# Stronger pod prefix sanitization (alphanumeric, dash, underscore only), done once at startup
+FILENAME_PREFIX = re.sub(r'[^a-zA-Z0-9_-]', '-', IMAGE_INDEX_PREFIX)[:20]
 
 # Security configuration
 MAX_IMAGE_SIZE_MB = int(os.getenv('MAX_IMAGE_SIZE_MB', '10'))  # 10MB default
 MAX_IMAGE_SIZE_BYTES = MAX_IMAGE_SIZE_MB * 1024 * 1024
+# Reject oversized request bodies before Werkzeug buffers them: a /detect/batch carries one
+# frame per resolution, each at most MAX_IMAGE_SIZE_MB once decoded but up to 4/3 of that
+# on the wire when the cluster base64-encodes it, plus headroom for multipart headers and form fields
+MULTIPART_OVERHEAD_BYTES = 1024 * 1024
+MAX_REQUEST_SIZE_BYTES = len(RESOLUTIONS) * (MAX_IMAGE_SIZE_BYTES * 4 // 3) + MULTIPART_OVERHEAD_BYTES
+app.config['MAX_CONTENT_LENGTH'] = MAX_REQUEST_SIZE_BYTES
 
 def get_next_image_index():
     """
     Thread-safe increment and return next image index
 
+    Rolls over to 1 after MAX_IMAGE_INDEX.
+
     Returns:
         int: Next sequential index for filename generation
     """
-    global image_counter
-    with counter_lock:
-        image_counter += 1
-        return image_counter
+    count = next(image_counter)
+    if count % MAX_IMAGE_INDEX == 1 and count > 1:
+        print(f"[WARN] Counter exceeded {MAX_IMAGE_INDEX:,}, rolling over to 1")
+    return (count - 1) % MAX_IMAGE_INDEX + 1
+
+# Cached (epoch_second, "YYYYMMDD_HHMMSS") pair for filenames; replaced as a whole like _ts_cache
+_filename_ts_cache = (0, '')
+
+def filename_timestamp():
+    """
+    Return the current local time as YYYYMMDD_HHMMSS, formatted at most once per second
+
+    Returns:
+        str: Filename timestamp
+    """
+    global _filename_ts_cache
+    second = int(time.time())
+    cached_second, cached = _filename_ts_cache
+    if second == cached_second:
+        return cached
+    stamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(second))
+    _filename_ts_cache = (second, stamp)
+    return stamp
 
 def generate_indexed_filename(resolution, index=None, ext='.png'):
     """
@@ -129,25 +467,16 @@ def generate_indexed_filename(resolution, index=None, ext='.png'):
     Returns:
         str: Generated filename
     """
-    import re
-
     if index is None:
         index = get_next_image_index()
 
-    # Counter rollover at 999,999 for 6-digit format
-    if index > 999999:
-        print(f"[WARN] Counter exceeded 999,999, rolling over to 1")
-        global image_counter
-        with counter_lock:
-            image_counter = 1
-        index = 1
-
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    # Explicit indexes past the 6-digit range roll over like the counter
+    if index > MAX_IMAGE_INDEX:
+        index = (index - 1) % MAX_IMAGE_INDEX + 1
 
-    # Stronger pod prefix sanitization (alphanumeric, dash, underscore only)
-    prefix = re.sub(r'[^a-zA-Z0-9_-]', '-', IMAGE_INDEX_PREFIX)[:20]
+    timestamp = filename_timestamp()
 
-    filename = f"{timestamp}_{prefix}_{index:06d}_{resolution}{ext}"
+    filename = f"{timestamp}_{FILENAME_PREFIX}_{index:06d}_{resolution}{ext}"
     return filename
 
 def validate_image_size(file_bytes):
@@ -155,7 +484,7 @@ def validate_image_size(file_bytes):
     Validate uploaded image size to prevent DoS attacks
 
     Args:
-        file_bytes (bytes): Image file bytes
+        file_bytes (bytes | memoryview): Image file bytes
 
     Raises:
         ValueError: If image exceeds size limit
@@ -167,10 +496,125 @@ def validate_image_size(file_bytes):
             f'Image too large: {size_mb:.2f}MB exceeds limit of {MAX_IMAGE_SIZE_MB}MB'
         )
 
+def read_upload(file_storage):
+    """
+    Return the contents of an uploaded file without copying when possible
+
+    InMemoryUploadRequest keeps uploads in an in-memory BytesIO, so a
+    memoryview over the existing buffer is returned instead of a fresh bytes
+    copy. Other streams (e.g. a SpooledTemporaryFile rolled over to disk) are read.
+
+    Args:
+        file_storage: Flask FileStorage object
+
+    Returns:
+        bytes | memoryview: Uploaded file contents
+    """
+    stream = file_storage.stream
+    buffer = getattr(stream, '_file', stream)
+    if isinstance(buffer, io.BytesIO):
+        return buffer.getbuffer()
+    return stream.read()
+
+
+def encode_jpeg(img, quality=JPEG_QUALITY):
+    """
+    Encode BGR image as JPEG bytes
+
+    Uses libjpeg-turbo through PyTurboJPEG when available, OpenCV otherwise.
+
+    Args:
+        img: BGR image (numpy array)
+        quality (int): JPEG quality (1-100)
+
+    Returns:
+        bytes: Encoded JPEG data
+    """
+    if turbo_jpeg is not None:
+        return turbo_jpeg.encode(img, quality=quality, pixel_format=TJPF_BGR)
+
+    _, img_encoded = cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return img_encoded.tobytes()
+
+# OpenCV's JPEG 2000 codec (OpenJPEG/Jasper) is not safe to call from several decode threads at once
+JPEG2000_SIGNATURES = (b'\x00\x00\x00\x0cjP  \r\n\x87\n', b'\xff\x4f\xff\x51')
+jpeg2000_lock = threading.Lock()
+
+def decode_image_bytes(file_bytes):
+    """
+    Decode image bytes into a BGR numpy array
+
+    JPEGs go through libjpeg-turbo (SIMD IDCT, BGR output without a separate
+    color swizzle) when PyTurboJPEG is available; PNG and other formats, and
+    any JPEG turbojpeg rejects, are decoded by OpenCV. JPEG 2000 decodes are
+    serialized, the other codecs run in parallel on decode_executor threads.
+
+    Args:
+        file_bytes (bytes | memoryview): Encoded image
+
+    Returns:
+        numpy.ndarray: Decoded BGR image, or None if decoding fails
+    """
+    if turbo_jpeg is not None and file_bytes[:2] == b'\xff\xd8':
+        try:
+            return turbo_jpeg.decode(file_bytes, pixel_format=TJPF_BGR)
+        except Exception:
+            pass
+
+    buffer = np.frombuffer(file_bytes, np.uint8)
+    if bytes(file_bytes[:12]).startswith(JPEG2000_SIGNATURES):
+        with jpeg2000_lock:
+            return cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+    return cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+
+# Uploads with this content type carry uncompressed HxWx3 BGR pixels, shape given as a
+# content-type parameter, e.g. "image/x-raw-bgr; shape=1080x1920"
+RAW_FRAME_MIMETYPE = 'image/x-raw-bgr'
+
+def decode_raw_frame(file_bytes, shape):
+    """
+    View raw BGR bytes as an image without decoding
+
+    Args:
+        file_bytes (bytes | memoryview): Uncompressed BGR pixels
+        shape (str): Frame shape as 'HxW' or 'HxWx3'
+
+    Returns:
+        numpy.ndarray: Read-only HxWx3 view of file_bytes, or None if the shape
+        is malformed or does not match the byte count
+    """
+    try:
+        dims = [int(d) for d in shape.lower().split('x')]
+    except ValueError:
+        return None
+    if len(dims) == 2:
+        dims.append(3)
+    if len(dims) != 3 or dims[2] != 3 or dims[0] * dims[1] * 3 != len(file_bytes):
+        return None
+    return np.frombuffer(file_bytes, np.uint8).reshape(dims)
+
+def decode_upload(file_obj, file_bytes):
+    """
+    Decode an uploaded file, taking the raw BGR fast path when the part declares it
+
+    Args:
+        file_obj: Flask FileStorage object the bytes were read from
+        file_bytes (bytes | memoryview): Upload contents
+
+    Returns:
+        numpy.ndarray: BGR image, or None if decoding fails
+    """
+    if file_obj.mimetype == RAW_FRAME_MIMETYPE:
+        return decode_raw_frame(file_bytes, file_obj.mimetype_params.get('shape', ''))
+    return decode_image_bytes(file_bytes)
 
 def send_frame_to_outputstreaming(img, resolution='unknown', source_topic='unknown'):
     """
-    Send annotated frame to outputstreaming service
+    Queue annotated frame for delivery to outputstreaming service
+
+    Encoding and the HTTP POST run on a background thread pool so the request
+    thread never waits on the network. When OUTPUTSTREAMING_MAX_PENDING frames
+    are already in flight the frame is dropped to keep the stream real-time.
 
     Args:
         img: Annotated image (numpy array)
@@ -186,32 +630,98 @@ def send_frame_to_outputstreaming(img, resolution='unknown', source_topic='unkno
         print(f"[WARN] No outputstreaming URL configured for resolution: {resolution}")
         return
 
+    if not outputstreaming_slots.acquire(blocking=False):
+        print(f"[WARN] Outputstreaming backlog full, dropping {resolution} frame")
+        return
+
+    future = outputstreaming_executor.submit(post_frame_to_outputstreaming, url, img, resolution, source_topic)
+    future.add_done_callback(lambda _: outputstreaming_slots.release())
+
+def post_frame_to_outputstreaming(url, img, resolution, source_topic):
+    """
+    Encode and POST annotated frame to outputstreaming (background worker)
+
+    Args:
+        url: Resolution-specific outputstreaming endpoint
+        img: Annotated image (numpy array)
+        resolution: Resolution label (256p, 720p, 1080p)
+        source_topic: Source topic name for filtering (e.g., 'video_frames')
+    """
     try:
-        # Encode image as PNG (preserves original format)
-        _, img_encoded = cv2.imencode('.png', img)
-        img_base64 = base64.b64encode(img_encoded.tobytes()).decode('utf-8')
-
-        # Send as JSON to resolution-specific endpoint with topic metadata
-        response = requests.post(
-            url,
-            json={
-                'frame': img_base64,
-                'topic': source_topic,
-                'resolution': resolution
-            },
-            timeout=2
-        )
+        # Encode image as JPEG (much faster than PNG's zlib pass, smaller payload)
+        jpeg_bytes = encode_jpeg(img)
+
+        if OUTPUTSTREAMING_PAYLOAD == 'jpeg':
+            # Raw JPEG body skips the base64 pass and its 33% size overhead
+            response = outputstreaming_session.post(
+                url,
+                data=jpeg_bytes,
+                headers={
+                    'Content-Type': 'image/jpeg',
+                    'X-Topic': source_topic,
+                    'X-Resolution': resolution
+                },
+                timeout=2
+            )
+        elif OUTPUTSTREAMING_PAYLOAD == 'multipart':
+            # Binary file part: no base64 pass, metadata as ordinary form fields
+            response = outputstreaming_session.post(
+                url,
+                files={'frame': (f'{resolution}.jpg', jpeg_bytes, 'image/jpeg')},
+                data={'topic': source_topic, 'resolution': resolution, 'format': 'jpeg'},
+                timeout=2
+            )
+        else:
+            # Send as JSON to resolution-specific endpoint with topic metadata
+            # (serialized with orjson rather than requests' stdlib json pass over the base64 blob)
+            response = outputstreaming_session.post(
+                url,
+                data=orjson.dumps({
+                    'frame': base64.b64encode(jpeg_bytes).decode('ascii'),
+                    'format': 'jpeg',
+                    'topic': source_topic,
+                    'resolution': resolution
+                }),
+                headers={'Content-Type': 'application/json'},
+                timeout=2
+            )
         if response.status_code == 200:
-            print(f"[INFO] Frame sent to outputstreaming ({resolution}, topic={source_topic}): {url}")
+            if VERBOSE_LOGGING:
+                print(f"[INFO] Frame sent to outputstreaming ({resolution}, topic={source_topic}): {url}")
         else:
             print(f"[WARN] Outputstreaming returned {response.status_code} for {resolution}")
     except requests.exceptions.RequestException as e:
         print(f"[ERROR] Failed to send frame to outputstreaming ({resolution}): {str(e)}")
+    except Exception as e:
+        print(f"[ERROR] Failed to encode frame for outputstreaming ({resolution}): {str(e)}")
 
 def generate_correlation_id():
     """Generate UUID v4 correlation ID for linking multi-resolution frames"""
     return str(uuid.uuid4())
 
+# Cached (monotonic_time, iso_string) pair; replaced as a whole so readers never see a torn update
+TIMESTAMP_TTL_SECONDS = 0.25
+_ts_cache = (0.0, '')
+
+def now_iso():
+    """
+    Return the current local time as an ISO 8601 string, cached for TIMESTAMP_TTL_SECONDS
+
+    Response timestamps are informational, so sharing one string across the
+    requests served within the same quarter second is fine.
+
+    Returns:
+        str: ISO 8601 timestamp
+    """
+    global _ts_cache
+    now = time.monotonic()
+    cached_at, cached = _ts_cache
+    if now - cached_at < TIMESTAMP_TTL_SECONDS:
+        return cached
+    stamp = datetime.now().isoformat()
+    _ts_cache = (now, stamp)
+    return stamp
+
 def decode_image_file(file_obj):
     """
     Decode image from binary or base64-encoded content
@@ -227,27 +737,28 @@ def decode_image_file(file_obj):
         numpy.ndarray: Decoded image or None if decoding fails
     """
     try:
-        content = file_obj.read()
+        content = read_upload(file_obj)
         content_size = len(content)
 
-        print(f"[DEBUG] Decoding {file_obj.filename}: size={content_size} bytes, first_20_bytes={content[:20]}")
+        if VERBOSE_LOGGING:
+            print(f"[DEBUG] Decoding {file_obj.filename}: size={content_size} bytes, first_20_bytes={bytes(content[:20])}")
 
         # Try decoding as raw binary first (standard format)
-        nparr = np.frombuffer(content, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        img = decode_upload(file_obj, content)
 
         if img is not None:
-            print(f"[DEBUG] Binary decode SUCCESS: {file_obj.filename} -> shape={img.shape}")
+            if VERBOSE_LOGGING:
+                print(f"[DEBUG] Binary decode SUCCESS: {file_obj.filename} -> shape={img.shape}")
             return img
 
         # Fallback: Try base64 decoding (cluster sends this)
         try:
             decoded = base64.b64decode(content)
-            nparr = np.frombuffer(decoded, np.uint8)
-            img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+            img = decode_image_bytes(decoded)
 
             if img is not None:
-                print(f"[INFO] Base64 decode SUCCESS: {file_obj.filename} -> shape={img.shape}")
+                if VERBOSE_LOGGING:
+                    print(f"[INFO] Base64 decode SUCCESS: {file_obj.filename} -> shape={img.shape}")
                 return img
         except Exception as b64_error:
             print(f"[WARN] Base64 decode FAILED for {file_obj.filename}: {b64_error}")
@@ -259,6 +770,82 @@ def decode_image_file(file_obj):
         print(f"[ERROR] Image decode exception for {file_obj.filename}: {e}")
         return None
 
+# Expected file names from cluster and the resolution label each one carries
+CLUSTER_RESOLUTIONS = {
+    '256.png': '256p',
+    '720.png': '720p',
+    '1080.png': '1080p'
+}
+EXPECTED_FILES = list(CLUSTER_RESOLUTIONS)
+
+def parse_requested_files(request):
+    """
+    Resolve which cluster files a /detect/batch request asks to process
+
+    The optional 'resolutions' field (form field, raw multipart field or query
+    parameter) is a comma-separated subset of the cluster resolutions, e.g.
+    "720p"; the other files are then neither required nor decoded/inferred.
+
+    Args:
+        request: Flask request object
+
+    Returns:
+        tuple: (expected filenames, errors)
+    """
+    value = request.form.get('resolutions')
+    if value is None and request.data:
+        span = find_multipart_field(request.data, 'resolutions')
+        if span:
+            value = request.data[span[0]:span[1]].decode('utf-8', errors='ignore')
+    if value is None:
+        value = request.args.get('resolutions')
+
+    labels = [label.strip() for label in (value or '').split(',') if label.strip()]
+    if not labels:
+        return EXPECTED_FILES, []
+
+    unknown = [label for label in labels if label not in CLUSTER_RESOLUTIONS.values()]
+    if unknown:
+        return EXPECTED_FILES, [f"Unknown resolutions: {', '.join(unknown)}"]
+    return [filename for filename in EXPECTED_FILES if CLUSTER_RESOLUTIONS[filename] in labels], []
+
+def find_multipart_field(buf, name):
+    """
+    Locate the value of a raw multipart field without decoding the body
+
+    Matches the layout the cluster sends: name="<name>" followed by a blank
+    line, then the value up to the end of that line. Uses bytes.find, so the
+    multi-MB body is never decoded to str or scanned by a regex.
+
+    Args:
+        buf (bytes): Raw request body
+        name (str): Field name, e.g. '256.png' or 'topic'
+
+    Returns:
+        tuple: (start, end) offsets of the value in buf, or None if not found
+    """
+    marker = f'name="{name}"'.encode()
+    pos = buf.find(marker)
+    if pos < 0:
+        return None
+    pos += len(marker)
+
+    # Blank line between the part header and its value (\r\n or bare \n)
+    for _ in range(2):
+        if buf[pos:pos + 2] == b'\r\n':
+            pos += 2
+        elif buf[pos:pos + 1] == b'\n':
+            pos += 1
+        else:
+            return None
+
+    end = buf.find(b'\n', pos)
+    if end < 0:
+        end = len(buf)
+    if end > pos and buf[end - 1:end] == b'\r':
+        end -= 1
+    return pos, end
+
 def parse_cluster_request(request):
     """
     Parse cluster multipart request with 3 resolution files + JSON metadata
@@ -270,59 +857,62 @@ def parse_cluster_request(request):
     Expected format:
     - Files: 256.png, 720.png, 1080.png (or any names with these patterns)
     - JSON metadata: {"topic": "video_frames"}
+    - Optional resolutions field selecting a subset, e.g. "720p" (see parse_requested_files)
 
     Returns:
-        tuple: (files_dict, metadata_dict, errors)
+        tuple: (files_dict, metadata_dict, errors); metadata carries the topic
+        and the resolution labels that were not requested ('skipped')
     """
-    errors = []
     files_dict = {}
-
-    # Expected file names from cluster
-    expected_files = ['256.png', '720.png', '1080.png']
+    expected_files, errors = parse_requested_files(request)
+    if errors:
+        return files_dict, {'topic': 'unknown', 'skipped': []}, errors
 
     # Method 1: Try standard Flask file parsing first
     if request.files:
-        print(f"[DEBUG] Found files in request.files: {list(request.files.keys())}")
+        if VERBOSE_LOGGING:
+            print(f"[DEBUG] Found files in request.files: {list(request.files.keys())}")
+        pending = {}
         for filename in expected_files:
             if filename in request.files:
-                file_obj = request.files[filename]
-                decoded_img = decode_image_file(file_obj)
-
-                if decoded_img is None:
-                    errors.append(f"Invalid or corrupt image: {filename}")
-                else:
-                    files_dict[filename] = decoded_img
+                pending[filename] = decode_executor.submit(decode_image_file, request.files[filename])
             else:
                 errors.append(f"Missing required file: {filename}")
 
+        for filename, future in pending.items():
+            decoded_img = future.result()
+            if decoded_img is None:
+                errors.append(f"Invalid or corrupt image: {filename}")
+            else:
+                files_dict[filename] = decoded_img
+
     # Method 2: If no files found, parse from raw multipart data
     # This handles cluster sending base64 data without proper file encoding
     elif request.data:
-        print(f"[DEBUG] No files in request.files, parsing raw multipart data...")
+        if VERBOSE_LOGGING:
+            print(f"[DEBUG] No files in request.files, parsing raw multipart data...")
         try:
-            data_str = request.data.decode('utf-8', errors='ignore')
+            raw = request.data
 
             # Extract base64-encoded images from multipart boundaries
             for filename in expected_files:
-                # Pattern: name="256.png"\r\n\r\n<base64_data>
-                pattern = rf'name="{re.escape(filename)}"\r?\n\r?\n([A-Za-z0-9+/=]+)'
-                match = re.search(pattern, data_str, re.MULTILINE | re.DOTALL)
+                # Layout: name="256.png"\r\n\r\n<base64_data>
+                span = find_multipart_field(raw, filename)
 
-                if match:
-                    base64_data = match.group(1).strip()
-                    # Clean up base64 (remove newlines, boundaries)
-                    base64_data = re.sub(r'[\r\n-]+', '', base64_data)
+                if span:
+                    # Non-alphabet bytes (stray \r, boundary dashes) are discarded by the decoder
+                    base64_data = memoryview(raw)[span[0]:span[1]]
 
                     try:
                         # Decode base64
                         img_bytes = base64.b64decode(base64_data)
                         # Decode image
-                        nparr = np.frombuffer(img_bytes, np.uint8)
-                        decoded_img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+                        decoded_img = decode_image_bytes(img_bytes)
 
                         if decoded_img is not None:
                             files_dict[filename] = decoded_img
-                            print(f"[INFO] Extracted {filename} from raw multipart data ({len(img_bytes)} bytes)")
+                            if VERBOSE_LOGGING:
+                                print(f"[INFO] Extracted {filename} from raw multipart data ({len(img_bytes)} bytes)")
                         else:
                             errors.append(f"Failed to decode extracted image: {filename}")
                     except Exception as e:
@@ -342,11 +932,10 @@ def parse_cluster_request(request):
 
     if request.data:
         try:
-            data_str = request.data.decode('utf-8', errors='ignore')
-            # Pattern matches: name="topic"\r\n\r\nvideo_frames
-            topic_match = re.search(r'name="topic"\r?\n\r?\n([^\r\n]+)', data_str)
-            if topic_match:
-                topic = topic_match.group(1).strip()
+            # Layout: name="topic"\r\n\r\nvideo_frames
+            span = find_multipart_field(request.data, 'topic')
+            if span:
+                topic = request.data[span[0]:span[1]].decode('utf-8', errors='ignore').strip() or 'unknown'
         except Exception as e:
             print(f"[WARN] Failed to parse topic from raw multipart data: {e}")
 
@@ -358,7 +947,8 @@ def parse_cluster_request(request):
     if topic == 'unknown':
         print(f"[WARN] Topic could not be extracted from request")
 
-    return files_dict, {'topic': topic}, errors
+    skipped = [CLUSTER_RESOLUTIONS[filename] for filename in EXPECTED_FILES if filename not in expected_files]
+    return files_dict, {'topic': topic, 'skipped': skipped}, errors
 
 def map_filename_to_resolution(filename):
     """
@@ -370,21 +960,501 @@ def map_filename_to_resolution(filename):
     Returns:
         str: Resolution label (256p, 720p, 1080p) or None
     """
-    mapping = {
-        '256.png': '256p',
-        '720.png': '720p',
-        '1080.png': '1080p'
-    }
-    return mapping.get(filename)
+    return CLUSTER_RESOLUTIONS.get(filename)
+
+def decode_jpeg_on_gpu(file_bytes):
+    """
+    Decode JPEG bytes straight into GPU memory with nvJPEG
+
+    Skips the CPU Huffman/IDCT pass and the later host-to-device copy of the
+    decoded frame. Only used when GPU_JPEG_DECODE is enabled.
+
+    Args:
+        file_bytes (bytes | memoryview): Uploaded image bytes
+
+    Returns:
+        torch.Tensor: CHW uint8 RGB tensor on the GPU, or None if the data is
+        not a JPEG or decoding failed (caller falls back to OpenCV)
+    """
+    if not GPU_JPEG_DECODE or file_bytes[:2] != b'\xff\xd8':
+        return None
+
+    try:
+        data = torch.frombuffer(bytearray(file_bytes), dtype=torch.uint8)
+        return decode_jpeg(data, mode=ImageReadMode.RGB, device='cuda')
+    except Exception as e:
+        print(f"[WARN] GPU JPEG decode failed, falling back to CPU: {e}")
+        return None
+
+def letterbox_tensor(frame, imgsz=ENGINE_IMGSZ, out=None):
+    """
+    Letterbox a CHW uint8 RGB tensor into a normalized 1x3ximgszximgsz batch
+
+    Runs on the tensor's device and mirrors ultralytics' LetterBox (centered
+    padding with value 114), so boxes map back with ops.scale_boxes.
+
+    Args:
+        frame (torch.Tensor): CHW uint8 RGB image
+        imgsz (int): Square model input size
+        out (torch.Tensor): Optional 1x3ximgszximgsz float tensor to fill in place
 
-def process_single_resolution(filename, file_bytes, resolution, correlation_id, source_topic):
+    Returns:
+        torch.Tensor: 1x3ximgszximgsz float tensor in [0, 1]
+    """
+    height, width = frame.shape[-2:]
+    gain = min(imgsz / height, imgsz / width)
+    new_h, new_w = round(height * gain), round(width * gain)
+    top = round((imgsz - new_h) / 2 - 0.1)
+    left = round((imgsz - new_w) / 2 - 0.1)
+
+    x = frame.unsqueeze(0).float().div_(255)
+    if (new_h, new_w) != (height, width):
+        x = F.interpolate(x, size=(new_h, new_w), mode='bilinear', align_corners=False)
+
+    if out is None:
+        out = torch.empty((1, 3, imgsz, imgsz), dtype=x.dtype, device=x.device)
+    out.fill_(114 / 255)
+    out[:, :, top:top + new_h, left:left + new_w] = x
+    return out
+
+def restore_result_scale(result, orig_shape):
     """
-    Process single resolution frame (Phase 1C - parallel worker)
+    Map boxes of a letterboxed tensor inference back onto the original frame
+
+    Args:
+        result: ultralytics Results object produced from a letterboxed tensor
+        orig_shape (tuple): Original (height, width) of the frame
+    """
+    boxes = result.boxes.data.clone()
+    boxes[:, :4] = ops.scale_boxes(result.orig_shape, boxes[:, :4], orig_shape)
+    result.orig_shape = tuple(orig_shape)
+    result.update(boxes=boxes)
+
+class InferenceBatcher:
+    """
+    Coalesce concurrent inference requests into batched YOLO forward passes
+
+    Request threads submit decoded images and wait on a Future. A single
+    background thread owns the model (ultralytics predictors are not
+    reentrant): it blocks for the first image, gathers more until max_batch
+    images are queued or timeout_ms has elapsed, runs one model call and
+    resolves every Future.
+
+    With GPU input (PINNED_UPLOAD / GPU_LETTERBOX / GPU_JPEG_DECODE) a second thread gathers
+    and uploads the next batch on its own CUDA stream while the current one
+    runs inference. Batches rotate through PIPELINE_SLOTS sets of pinned host
+    and device buffers, fenced with CUDA events.
+    """
+
+    PIPELINE_SLOTS = 3  # one uploading, one queued, one in inference
+    WARMUP_SHAPES = [(256, 256), (720, 1280), (1080, 1920)]  # (h, w) of the cluster resolutions
+
+    def __init__(self, max_batch, timeout_ms):
+        self.max_batch = max_batch
+        self.timeout = timeout_ms / 1000.0
+        self.queue = queue.Queue()
+        self.prepared = queue.Queue(maxsize=1)
+        self.thread = None
+        self.start_lock = threading.Lock()
+        self.slots = []
+        self.copy_stream = None
+        self.graph_sizes = []
+        self.predict_args = {}
+        self.input_dtype = torch.float32
+        self.letterbox = LetterBox(new_shape=(ENGINE_IMGSZ, ENGINE_IMGSZ), auto=False)
+
+    def submit(self, img):
+        """
+        Queue image for inference
+
+        Args:
+            img: Decoded BGR image (numpy array) or CHW RGB tensor on the GPU
+
+        Returns:
+            Future: Resolves to the ultralytics Results object for the image
+        """
+        self._ensure_started()
+        future = Future()
+        self.queue.put((img, future))
+        return future
+
+    def warm_up(self):
+        """
+        Run one dummy frame through the inference thread and wait for it
+
+        Pays CUDA context creation, cuDNN algorithm search and TensorRT
+        execution context setup before the first real request does. After a
+        single frame, the three /detect/batch resolutions are submitted
+        together so the batch-of-3 shape and the per-size CPU letterbox are
+        exercised too.
+
+        Raises:
+            Exception: The inference thread's setup error, if it failed
+            TimeoutError: Warm-up did not finish within WARMUP_TIMEOUT_S
+        """
+        start = time.time()
+        deadline = time.monotonic() + WARMUP_TIMEOUT_S
+        try:
+            self.submit(np.zeros((ENGINE_IMGSZ, ENGINE_IMGSZ, 3), dtype=np.uint8)).result(timeout=WARMUP_TIMEOUT_S)
+            futures = [self.submit(np.zeros((h, w, 3), dtype=np.uint8)) for h, w in self.WARMUP_SHAPES]
+            for future in futures:
+                future.result(timeout=max(deadline - time.monotonic(), 0))
+        except FutureTimeoutError:
+            print(f"[ERROR] Inference warm-up did not finish within {WARMUP_TIMEOUT_S:.0f}s")
+            raise TimeoutError(f"Inference warm-up did not finish within {WARMUP_TIMEOUT_S:.0f}s") from None
+        except Exception as e:
+            print(f"[ERROR] Inference warm-up failed: {str(e)}")
+            raise
+        print(f"[INFO] Inference warm-up done in {(time.time() - start) * 1000:.0f}ms")
+
+    def _ensure_started(self):
+        # Started lazily so the thread always lives in the serving process
+        if self.thread is None:
+            with self.start_lock:
+                if self.thread is None:
+                    self.thread = threading.Thread(target=self._run, name='inference-batcher', daemon=True)
+                    self.thread.start()
+
+    def _next_batch(self):
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + self.timeout
+
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _allocate_slots(self):
+        # Allocated on the inference thread so CUDA is initialised in the serving process
+        self.copy_stream = torch.cuda.Stream()
+        for _ in range(self.PIPELINE_SLOTS):
+            host = None
+            if PINNED_UPLOAD:
+                host = torch.empty(
+                    (self.max_batch, 3, ENGINE_IMGSZ, ENGINE_IMGSZ),
+                    dtype=torch.uint8,
+                    pin_memory=True
+                )
+            self.slots.append({
+                'host': host,
+                'device': torch.empty(
+                    (self.max_batch, 3, ENGINE_IMGSZ, ENGINE_IMGSZ),
+                    dtype=self.input_dtype,
+                    device='cuda'
+                ),
+                'ready': torch.cuda.Event(),  # upload finished on the copy stream
+                'done': torch.cuda.Event()    # inference finished reading the buffers
+            })
+
+    @torch.inference_mode()
+    def _upload(self, images, slot):
+        # numpy frames are letterboxed on the CPU into the pinned staging buffer
+        # and uploaded in one non-blocking copy (or, with GPU_LETTERBOX, uploaded
+        # raw and letterboxed on the GPU); GPU tensors are letterboxed in place.
+        # All are written into the slot's preallocated device batch, so a forward
+        # pass allocates no input memory of its own
+        batch = slot['device'][:len(images)]
+
+        if GPU_LETTERBOX:
+            for i, img in enumerate(images):
+                if isinstance(img, np.ndarray):
+                    # HWC BGR uint8 -> CHW RGB view; resize, pad and /255 happen on the GPU
+                    img = torch.from_numpy(img).to('cuda').permute(2, 0, 1).flip(0)
+                letterbox_tensor(img, out=batch[i:i + 1])
+            return batch
+
+        frames = [img for img in images if isinstance(img, np.ndarray)]
+        uploaded = None
+        if frames:
+            host = slot['host']
+            if host is None:
+                host = torch.empty((len(frames), 3, ENGINE_IMGSZ, ENGINE_IMGSZ), dtype=torch.uint8)
+            for i, img in enumerate(frames):
+                letterboxed = self.letterbox(image=img)
+                chw_rgb = np.ascontiguousarray(letterboxed[..., ::-1].transpose(2, 0, 1))
+                host[i].copy_(torch.from_numpy(chw_rgb))
+            uploaded = host[:len(frames)].to('cuda', non_blocking=True)
+
+        next_frame = 0
+        for i, img in enumerate(images):
+            if isinstance(img, np.ndarray):
+                batch[i].copy_(uploaded[next_frame]).div_(255)
+                next_frame += 1
+            else:
+                letterbox_tensor(img, out=batch[i:i + 1])
+        return batch
+
+    def _predict(self, inputs, **extra_args):
+        return model(
+            inputs,
+            conf=CONFIDENCE_THRESHOLD,
+            iou=IOU_THRESHOLD,
+            max_det=MAX_DETECTIONS,
+            verbose=False,
+            **self.predict_args,
+            **extra_args
+        )
+
+    def _enable_half_precision(self):
+        # Only the PyTorch model is cast; ultralytics renamed `half` to `quantize=16` in newer releases
+        if not isinstance(model.model, torch.nn.Module):
+            return
+        torch.set_float32_matmul_precision('high')
+        if 'quantize' in DEFAULT_CFG_DICT:
+            self.predict_args['quantize'] = 16
+        else:
+            self.predict_args['half'] = True
+        if 'channels_last' in DEFAULT_CFG_DICT:
+            self.predict_args['channels_last'] = True
+        # The device batch is written in FP16 directly, so the forward pass does no cast of its own
+        self.input_dtype = torch.float16
+
+    def _predict_batch(self, slot, size):
+        # Run the first `size` rows of the slot's device batch, padded up to a captured graph size
+        if not self.graph_sizes:
+            return self._predict(slot['device'][:size])
+        padded = next(n for n in self.graph_sizes if n >= size)
+        return self._predict(slot['device'][:padded], compile='reduce-overhead')[:size]
+
+    def _capture_graphs(self):
+        # CUDA graphs need static shapes: batches are padded to power-of-two sizes,
+        # each compiled and captured here before the first request arrives
+        if not isinstance(model.model, torch.nn.Module) or 'compile' not in DEFAULT_CFG_DICT:
+            print("[WARN] USE_CUDA_GRAPH needs the PyTorch model and an ultralytics release with compile support, ignoring")
+            return
+
+        sizes = []
+        size = 1
+        while size < self.max_batch:
+            sizes.append(size)
+            size *= 2
+        sizes.append(self.max_batch)
+
+        slot = self.slots[0]
+        slot['device'].zero_()
+        start = time.time()
+        for size in sizes:
+            self._predict(slot['device'][:size], compile='reduce-overhead')
+        self.graph_sizes = sizes
+        print(f"[INFO] CUDA graphs captured for batch sizes {sizes} in {time.time() - start:.1f}s")
+
+    @torch.inference_mode()
+    def _restore_scale(self, images, results):
+        for img, result in zip(images, results):
+            if isinstance(img, np.ndarray):
+                restore_result_scale(result, img.shape[:2])
+                result.orig_img = img  # annotate the original frame, not the letterboxed copy
+            else:
+                restore_result_scale(result, img.shape[-2:])
+
+    @staticmethod
+    def _resolve(batch, results):
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    @staticmethod
+    def _fail(batch, error):
+        for _, future in batch:
+            future.set_exception(error)
+
+    def _run(self):
+        if not (PINNED_UPLOAD or GPU_LETTERBOX or GPU_JPEG_DECODE):
+            # Without CUDA, numpy frames go through ultralytics' own preprocessing
+            while True:
+                batch = self._next_batch()
+                try:
+                    results = self._predict([img for img, _ in batch])
+                except Exception as e:
+                    self._fail(batch, e)
+                    continue
+                self._resolve(batch, results)
+
+        try:
+            # Input shapes are fixed (ENGINE_IMGSZ letterbox), so cuDNN's tuned kernel choice sticks
+            torch.backends.cudnn.benchmark = True
+            if HALF_PRECISION:
+                self._enable_half_precision()
+            self._allocate_slots()
+            if USE_CUDA_GRAPH:
+                self._capture_graphs()
+            threading.Thread(target=self._prepare_loop, name='inference-upload', daemon=True).start()
+        except Exception as e:
+            print(f"[ERROR] Inference thread setup failed: {str(e)}")
+            # Nothing else serves the queue: fail every waiting and future request with the setup error
+            while True:
+                _, future = self.queue.get()
+                future.set_exception(e)
+
+        while True:
+            batch, slot, inputs = self.prepared.get()
+            images = [img for img, _ in batch]
+            try:
+                if inputs is None:
+                    results = self._predict(images)
+                else:
+                    torch.cuda.current_stream().wait_event(slot['ready'])
+                    results = self._predict_batch(slot, len(inputs))
+                    self._restore_scale(images, results)
+            except Exception as e:
+                self._fail(batch, e)
+                continue
+            finally:
+                slot['done'].record()
+            self._resolve(batch, results)
+
+    def _prepare_loop(self):
+        # Gathers and uploads batch N+1 on the copy stream while batch N is in inference
+        for index in itertools.count():
+            batch = self._next_batch()
+            images = [img for img, _ in batch]
+            slot = self.slots[index % self.PIPELINE_SLOTS]
+
+            if not (PINNED_UPLOAD or GPU_LETTERBOX) and all(isinstance(img, np.ndarray) for img in images):
+                # GPU decode enabled but nothing decoded on the GPU: let ultralytics preprocess
+                self.prepared.put((batch, slot, None))
+                continue
+
+            try:
+                # The slot's previous batch must be fully consumed before its buffers are rewritten
+                slot['done'].synchronize()
+                with torch.cuda.stream(self.copy_stream):
+                    # nvJPEG frames were decoded on the default stream by request threads
+                    self.copy_stream.wait_stream(torch.cuda.default_stream())
+                    inputs = self._upload(images, slot)
+                    slot['ready'].record(self.copy_stream)
+            except Exception as e:
+                self._fail(batch, e)
+                continue
+
+            self.prepared.put((batch, slot, inputs))
+
+inference_batcher = InferenceBatcher(MAX_BATCH, BATCH_TIMEOUT_MS)
+
+def run_inference(images):
+    """
+    Run YOLO inference on a list of images through the micro-batcher
+
+    All images are queued together so they share a forward pass, and may be
+    batched with images from other concurrent requests. Each result's tensors
+    are moved to host memory once here, so detection extraction and drawing
+    read the same CPU copy instead of each syncing with the GPU.
+
+    Args:
+        images: List of decoded images (numpy arrays)
+
+    Returns:
+        list: One ultralytics Results object (on CPU) per input image, in input order
+
+    Raises:
+        TimeoutError: If results are not ready within INFERENCE_TIMEOUT_S
+    """
+    futures = [inference_batcher.submit(img) for img in images]
+    deadline = time.monotonic() + INFERENCE_TIMEOUT_S
+    return [future.result(timeout=max(deadline - time.monotonic(), 0)).cpu() for future in futures]
+
+def extract_detections(result):
+    """
+    Convert YOLO result boxes to detection dicts
+
+    The packed box tensor (x1, y1, x2, y2, conf, cls per row) is copied to
+    host in a single transfer per image, regardless of box count.
+
+    Args:
+        result: ultralytics Results object
+
+    Returns:
+        list: Detection dicts with class, class_id, confidence and bbox
+        (a dict, or a [x1, y1, x2, y2] list when BBOX_FORMAT is 'list').
+        With BBOX_FORMAT 'columns', a dict of parallel lists instead:
+        classes, class_ids, confidences and bboxes ([x1, y1, x2, y2] each)
+    """
+    data = result.boxes.data.cpu().numpy()
+    # tolist() converts whole arrays to Python scalars in C rather than one float() per field
+    xyxy = data[:, :4].tolist()
+    confs = data[:, -2].tolist()
+    clss = data[:, -1].astype(int).tolist()
+    names = CLASS_NAMES
+
+    if BBOX_FORMAT == 'columns':
+        return {
+            'classes': [names[class_id] for class_id in clss],
+            'class_ids': clss,
+            'confidences': confs,
+            'bboxes': xyxy
+        }
+
+    if BBOX_FORMAT == 'list':
+        return [
+            {'class': names[class_id], 'class_id': class_id, 'confidence': confidence, 'bbox': bbox}
+            for bbox, confidence, class_id in zip(xyxy, confs, clss)
+        ]
+
+    return [
+        {
+            'class': names[class_id],
+            'class_id': class_id,
+            'confidence': confidence,
+            'bbox': {'x1': x1, 'y1': y1, 'x2': x2, 'y2': y2}
+        }
+        for (x1, y1, x2, y2), confidence, class_id in zip(xyxy, confs, clss)
+    ]
+
+def draw_detections(result):
+    """
+    Draw detection boxes and labels on a copy of the result's original frame
+
+    Replaces result.plot(), which builds an Annotator per call and resolves
+    fonts, colors and label sizes box by box. Here the boxes come over in one
+    transfer and each is drawn with plain OpenCV calls.
+
+    Args:
+        result: ultralytics Results object
+
+    Returns:
+        numpy.ndarray: Annotated BGR image
+    """
+    img = np.ascontiguousarray(result.orig_img).copy()
+    data = result.boxes.data.cpu().numpy()
+    if not len(data):
+        return img
+
+    # Same line width / font scale heuristic as Ultralytics' Annotator
+    line_width = max(round(sum(img.shape[:2]) / 2 * 0.003), 2)
+    font_scale = line_width / 3
+    font_thickness = max(line_width - 1, 1)
+
+    boxes = data[:, :4].round().astype(int).tolist()
+    confs = data[:, -2].tolist()
+    clss = data[:, -1].astype(int).tolist()
+    for (x1, y1, x2, y2), confidence, class_id in zip(boxes, confs, clss):
+        color = CLASS_COLORS[class_id]
+        cv2.rectangle(img, (x1, y1), (x2, y2), color, line_width)
+
+        label = f"{CLASS_NAMES[class_id]} {confidence:.2f}"
+        (text_w, text_h), _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, font_scale, font_thickness)
+        # Label above the box, or inside it when the box touches the top edge
+        y_text = y1 - 2 if y1 >= text_h + 3 else y1 + text_h + 2
+        cv2.rectangle(img, (x1, y_text - text_h - 1), (x1 + text_w, y_text + 2), color, -1)
+        cv2.putText(img, label, (x1, y_text), cv2.FONT_HERSHEY_SIMPLEX, font_scale,
+                    (255, 255, 255), font_thickness, cv2.LINE_AA)
+
+    return img
+
+def process_single_resolution(filename, resolution, img_data, result, correlation_id, source_topic):
+    """
+    Post-process single resolution frame after batched inference (Phase 1C - parallel worker)
 
     Args:
         filename: Original filename
-        file_bytes: Image file bytes
         resolution: Resolution label (256p, 720p, 1080p)
+        img_data: Decoded image (numpy array)
+        result: ultralytics Results object for this image
         correlation_id: UUID linking multi-resolution frames
         source_topic: Kafka topic name
 
@@ -392,74 +1462,36 @@ def process_single_resolution(filename, file_bytes, resolution, correlation_id,
         dict: Processing result with success/error status
     """
     try:
-        # Validate size
-        validate_image_size(file_bytes)
-
-        # Decode image
-        np_arr = np.frombuffer(file_bytes, np.uint8)
-        img_data = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
-
-        if img_data is None:
-            return {
-                'filename': filename,
-                'resolution': resolution,
-                'success': False,
-                'error': 'Failed to decode image'
-            }
-
         height, width = img_data.shape[:2]
 
         # Generate indexed filename
-        indexed_filename = generate_indexed_filename(resolution)
-
-        # Perform object detection (thread-safe with model lock)
-        with model_lock:
-            detection_results = model(
-                img_data,
-                conf=CONFIDENCE_THRESHOLD,
-                iou=IOU_THRESHOLD,
-                max_det=MAX_DETECTIONS,
-                verbose=False
-            )
+        indexed_filename = generate_indexed_filename(resolution, ext='.png' if STORED_IMAGE_FORMAT == 'png' else '.jpg')
 
         # Process detections
-        detections = []
-        result = detection_results[0]
-
-        for box in result.boxes:
-            x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-            confidence = float(box.conf[0].cpu().numpy())
-            class_id = int(box.cls[0].cpu().numpy())
-            class_name = model.names[class_id]
-
-            detections.append({
-                'class': class_name,
-                'class_id': class_id,
-                'confidence': confidence,
-                'bbox': {
-                    'x1': float(x1),
-                    'y1': float(y1),
-                    'x2': float(x2),
-                    'y2': float(y2)
-                }
-            })
+        detections = extract_detections(result)
 
-        # Generate annotated image
-        annotated_img = result.plot()
+        # Generate annotated image only when outputstreaming or DB storage consumes it
+        img_bytes = None
+        if SEND_TO_OUTPUTSTREAMING or ENABLE_DB_STORAGE:
+            annotated_img = draw_detections(result)
 
-        # Send to outputstreaming with resolution and topic
-        send_frame_to_outputstreaming(annotated_img, resolution, source_topic)
+            # Send to outputstreaming with resolution and topic
+            send_frame_to_outputstreaming(annotated_img, resolution, source_topic)
 
-        # Encode for storage
-        _, img_encoded = cv2.imencode('.png', annotated_img)
-        img_bytes = img_encoded.tobytes()
+            # Encode for storage (dropped from the response, so skip it without a DB)
+            if ENABLE_DB_STORAGE:
+                if STORED_IMAGE_FORMAT == 'png':
+                    _, img_encoded = cv2.imencode('.png', annotated_img)
+                    img_bytes = img_encoded.tobytes()
+                else:
+                    img_bytes = encode_jpeg(annotated_img)
 
         # Return result for storage
         return {
             'filename': filename,
             'resolution': resolution,
             'indexed_filename': indexed_filename,
-            'detection_count': len(detections),
+            'detection_count': len(result.boxes),
             'detections': detections,
             'annotated_image': img_bytes,
             'image_width': width,
@@ -467,14 +1499,6 @@ def process_single_resolution(filename, file_bytes, resolution, correlation_id,
             'success': True
         }
 
-    except ValueError as e:
-        # Size validation error
-        return {
-            'filename': filename,
-            'resolution': resolution,
-            'success': False,
-            'error': str(e)
-        }
     except Exception as e:
         return {
             'filename': filename,
@@ -485,7 +1509,10 @@ def process_single_resolution(filename, file_bytes, resolution, correlation_id,
 
 def process_resolutions_parallel(files_dict, correlation_id, source_topic):
     """
-    Process multiple resolutions in parallel using ThreadPoolExecutor (Phase 1C)
+    Process multiple resolutions with one batched inference call (Phase 1C)
+
+    Frames are decoded first, run through the model in a single forward pass,
+    then annotated/encoded/forwarded in parallel on the shared postprocess pool.
 
     Args:
         files_dict: Dict of {filename: file_object} or {filename: numpy_array}
@@ -495,21 +1522,18 @@ def process_resolutions_parallel(files_dict, correlation_id, source_topic):
     Returns:
         list: Results for each resolution
     """
-    import time
     start_time = time.time()
 
     # Read all files first (I/O outside thread pool)
-    # Handle both FileStorage objects and pre-decoded numpy arrays
+    # Frames already decoded by parse_cluster_request are handed through as-is
     files_data = {}
     for filename, file_obj_or_array in files_dict.items():
-        # Check if already decoded (numpy array)
         if isinstance(file_obj_or_array, np.ndarray):
-            # Already decoded by parse_cluster_request
-            file_bytes = cv2.imencode('.png', file_obj_or_array)[1].tobytes()
-        else:
-            # FileStorage object - read as usual
-            file_bytes = file_obj_or_array.read()
+            files_data[filename] = file_obj_or_array
+            continue
 
+        # FileStorage object - view the upload buffer without copying it
+        file_bytes = read_upload(file_obj_or_array)
         if len(file_bytes) == 0:
             # Skip empty files
             continue
@@ -517,54 +1541,118 @@ def process_resolutions_parallel(files_dict, correlation_id, source_topic):
 
     results = []
 
-    # Process resolutions in parallel
-    with ThreadPoolExecutor(max_workers=3) as executor:
-        futures = {}
-
-        for filename, file_bytes in files_data.items():
-            resolution = map_filename_to_resolution(filename)
-            if not resolution:
-                results.append({
-                    'filename': filename,
-                    'success': False,
-                    'error': f'Unknown resolution mapping for {filename}'
-                })
-                continue
+    # Pass 1: validate and decode every uploaded frame
+    pending = []
+    for filename, img_or_bytes in files_data.items():
+        resolution = map_filename_to_resolution(filename)
+        if not resolution:
+            results.append({
+                'filename': filename,
+                'success': False,
+                'error': f'Unknown resolution mapping for {filename}'
+            })
+            continue
 
-            # Submit processing task
-            future = executor.submit(
-                process_single_resolution,
-                filename, file_bytes, resolution, correlation_id, source_topic
-            )
-            futures[future] = resolution
+        if isinstance(img_or_bytes, np.ndarray):
+            pending.append((filename, resolution, img_or_bytes))
+            continue
 
-        # Collect results as they complete
-        for future in as_completed(futures):
-            resolution = futures[future]
-            try:
-                result = future.result()
-                results.append(result)
-            except Exception as e:
-                results.append({
-                    'resolution': resolution,
-                    'success': False,
-                    'error': f'Thread execution error: {str(e)}'
-                })
+        try:
+            validate_image_size(img_or_bytes)
+        except ValueError as e:
+            # Size validation error
+            results.append({
+                'filename': filename,
+                'resolution': resolution,
+                'success': False,
+                'error': str(e)
+            })
+            continue
+
+        img_data = decode_image_bytes(img_or_bytes)
+
+        if img_data is None:
+            results.append({
+                'filename': filename,
+                'resolution': resolution,
+                'success': False,
+                'error': 'Failed to decode image'
+            })
+            continue
+
+        pending.append((filename, resolution, img_data))
+
+    # Pass 2: single batched forward pass for all resolutions
+    try:
+        batch_results = run_inference([img_data for _, _, img_data in pending])
+    except Exception as e:
+        for filename, resolution, _ in pending:
+            results.append({
+                'filename': filename,
+                'resolution': resolution,
+                'success': False,
+                'error': f'Inference error: {str(e)}'
+            })
+        pending, batch_results = [], []
+
+    # Pass 3: annotate, encode and forward each resolution in parallel
+    futures = {}
+    for (filename, resolution, img_data), result in zip(pending, batch_results):
+        future = postprocess_executor.submit(
+            process_single_resolution,
+            filename, resolution, img_data, result, correlation_id, source_topic
+        )
+        futures[future] = resolution
+
+    # Collect results as they complete
+    for future in as_completed(futures):
+        resolution = futures[future]
+        try:
+            result = future.result()
+            results.append(result)
+        except Exception as e:
+            results.append({
+                'resolution': resolution,
+                'success': False,
+                'error': f'Thread execution error: {str(e)}'
+            })
 
     elapsed = time.time() - start_time
-    print(f"[PERF] Parallel processing: {elapsed*1000:.0f}ms for {len(results)} resolutions")
+    if VERBOSE_LOGGING:
+        print(f"[PERF] Batched processing: {elapsed*1000:.0f}ms for {len(results)} resolutions")
 
     return results
 
 
+@app.before_request
+def reject_oversized_request():
+    """
+    Reject bodies over MAX_CONTENT_LENGTH from the Content-Length header alone
+
+    Runs before any view reads the body, so nothing is buffered, and answers
+    with JSON instead of surfacing Werkzeug's 413 through the views' generic
+    500 handlers.
+    """
+    if request.content_length is not None and request.content_length > app.config['MAX_CONTENT_LENGTH']:
+        return request_too_large(None)
+
+@app.errorhandler(RequestEntityTooLarge)
+def request_too_large(error):
+    """JSON 413 for bodies over MAX_REQUEST_SIZE_BYTES (header check above, or Werkzeug while streaming)"""
+    return json_response({
+        'success': False,
+        'error': f'Request body exceeds {MAX_REQUEST_SIZE_BYTES / (1024 * 1024):.1f}MB limit',
+        'timestamp': now_iso()
+    }, 413)
+
 @app.route('/health', methods=['GET'])
 def health():
     """Health check endpoint"""
-    return jsonify({
+    return json_response({
         'status': 'healthy',
         'model': 'YOLO12-nano',
-        'timestamp': datetime.now().isoformat()
-    }), 200
+        'timestamp': now_iso()
+    }, 200)
 
 
 @app.route('/detect', methods=['POST'])
@@ -578,67 +1666,46 @@ def detect_objects():
     try:
         # Get the first file from request (accepts any field name)
         if not request.files:
-            return jsonify({'error': 'No image file provided'}), 400
+            return json_response({'error': 'No image file provided'}, 400)
 
         # Get first uploaded file regardless of field name
         file = next(iter(request.files.values()))
 
         # Check if the file is valid
         if file.filename == '':
-            return jsonify({'error': 'No selected file'}), 400
+            return json_response({'error': 'No selected file'}, 400)
 
-        # Read and decode image (OpenCV handles format validation)
-        file_bytes = np.frombuffer(file.read(), np.uint8)
-        img_data = cv2.imdecode(file_bytes, cv2.IMREAD_COLOR)
+        # Read and decode image (nvJPEG on GPU hosts, otherwise libjpeg-turbo/OpenCV handle format validation)
+        file_bytes = read_upload(file)
+        img_data = None if file.mimetype == RAW_FRAME_MIMETYPE else decode_jpeg_on_gpu(file_bytes)
+        if img_data is None:
+            img_data = decode_upload(file, file_bytes)
         
         if img_data is None:
-            return jsonify({'error': 'Failed to decode image'}), 400
+            return json_response({'error': 'Failed to decode image'}, 400)
 
         # Get original image dimensions
-        height, width, channels = img_data.shape
+        if isinstance(img_data, torch.Tensor):
+            height, width = img_data.shape[-2:]
+        else:
+            height, width = img_data.shape[:2]
 
-        # Perform object detection
-        results = model(
-            img_data,
-            conf=CONFIDENCE_THRESHOLD,
-            iou=IOU_THRESHOLD,
-            max_det=MAX_DETECTIONS,
-            verbose=False
-        )
+        # Perform object detection (batched with concurrent requests)
+        results = run_inference([img_data])
 
         # Process detection results
-        detections = []
         result = results[0]
-        
-        for box in result.boxes:
-            # Extract detection information
-            x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-            confidence = float(box.conf[0].cpu().numpy())
-            class_id = int(box.cls[0].cpu().numpy())
-            class_name = model.names[class_id]
-            
-            detection = {
-                'class': class_name,
-                'class_id': class_id,
-                'confidence': confidence,
-                'bbox': {
-                    'x1': float(x1),
-                    'y1': float(y1),
-                    'x2': float(x2),
-                    'y2': float(y2)
-                }
-            }
-            detections.append(detection)
+        detections = extract_detections(result)
 
         # Prepare response
         response = {
             'success': True,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': now_iso(),
             'image_dimensions': {
                 'width': width,
                 'height': height
             },
-            'detection_count': len(detections),
+            'detection_count': len(result.boxes),
             'detections': detections,
             'model_info': {
                 'model': 'YOLO12-nano',
@@ -647,14 +1714,16 @@ def detect_objects():
             }
         }
 
-        return jsonify(response), 200
+        return json_response(response, 200)
 
+    except RequestEntityTooLarge:
+        raise  # answered as JSON 413 by request_too_large
     except Exception as e:
-        return jsonify({
+        return json_response({
             'success': False,
             'error': str(e),
-            'timestamp': datetime.now().isoformat()
-        }), 500
+            'timestamp': now_iso()
+        }, 500)
 
 @app.route('/detect/batch', methods=['POST'])
 @cross_origin(origin="*")
@@ -666,6 +1735,7 @@ def detect_objects_batch():
     - Content-Type: multipart/form-data
     - Files: 256.png, 720.png, 1080.png (any field names accepted)
     - JSON metadata: {"topic": "video_frames"} (optional)
+    - resolutions: comma-separated subset to process, e.g. "720p" (optional, default all)
 
     Returns:
         JSON with correlation_id, results for each resolution, and timestamps
@@ -683,7 +1753,6 @@ def detect_objects_batch():
       "timestamp": "2025-11-19T17:30:00Z"
     }
     """
-    import time
     start_time = time.time()
 
     try:
@@ -691,54 +1760,52 @@ def detect_objects_batch():
         files_dict, metadata, parse_errors = parse_cluster_request(request)
 
         # DEBUG LOGGING - capture exact validation failure details
-        print(f"[DEBUG] /detect/batch request received from {request.remote_addr}")
-        print(f"[DEBUG] Request files: {list(request.files.keys())}")
-        print(f"[DEBUG] Files decoded successfully: {list(files_dict.keys())}")
-        print(f"[DEBUG] Metadata extracted: {metadata}")
-        print(f"[DEBUG] Parse errors: {parse_errors}")
+        if VERBOSE_LOGGING:
+            print(f"[DEBUG] /detect/batch request received from {request.remote_addr}")
+            print(f"[DEBUG] Request files: {list(request.files.keys())}")
+            print(f"[DEBUG] Files decoded successfully: {list(files_dict.keys())}")
+            print(f"[DEBUG] Metadata extracted: {metadata}")
+            print(f"[DEBUG] Parse errors: {parse_errors}")
 
         if parse_errors:
             error_response = {
                 'success': False,
                 'error': 'Invalid request format',
                 'details': parse_errors,
-                'expected_files': ['256.png', '720.png', '1080.png'],
-                'expected_metadata': {'topic': 'string'},
+                'expected_files': EXPECTED_FILES,
+                'expected_metadata': {'topic': 'string', 'resolutions': 'comma-separated subset (optional)'},
                 'received_files': list(request.files.keys()),
                 'files_decoded': list(files_dict.keys())
             }
             print(f"[ERROR] /detect/batch validation failed: {error_response}")
-            return jsonify(error_response), 400
+            return json_response(error_response, 400)
 
         source_topic = metadata['topic']
         correlation_id = generate_correlation_id()
 
-        print(f"[INFO] Processing cluster batch: topic={source_topic}, correlation_id={correlation_id}")
+        if VERBOSE_LOGGING:
+            print(f"[INFO] Processing cluster batch: topic={source_topic}, correlation_id={correlation_id}")
 
         # Phase 1C: Process resolutions in parallel
         results = process_resolutions_parallel(files_dict, correlation_id, source_topic)
 
         # Store successful results in database (if enabled)
         if ENABLE_DB_STORAGE:
-            successful_results = [r for r in results if r.get('success', False)]
-            for result in successful_results:
-                try:
-                    detection_record = DetectionResult(
-                        filename=result['filename'],
-                        indexed_filename=result['indexed_filename'],
-                        resolution=result['resolution'],
-                        detection_count=result['detection_count'],
-                        detections=result['detections'],
-                        annotated_image=result['annotated_image'],
-                        image_width=result['image_width'],
-                        image_height=result['image_height']
-                    )
-                    db.session.add(detection_record)
-                    db.session.commit()
-                    print(f"[INFO] Stored detection result in DB (filename: {result['indexed_filename']})")
-                except Exception as db_error:
-                    print(f"[ERROR] Failed to store in DB: {str(db_error)}")
-                    db.session.rollback()
+            rows = [
+                {
+                    'filename': result['filename'],
+                    'indexed_filename': result['indexed_filename'],
+                    'resolution': result['resolution'],
+                    'detection_count': result['detection_count'],
+                    'detections': result['detections'],
+                    'annotated_image': result['annotated_image'],
+                    'image_width': result['image_width'],
+                    'image_height': result['image_height']
+                }
+                for result in results if result.get('success', False)
+            ]
+            if rows:
+                detection_writer.submit(rows)
 
         # Calculate processing time
         processing_time_ms = (time.time() - start_time) * 1000
@@ -759,9 +1826,10 @@ def detect_objects_batch():
             'total_resolutions': len(results),
             'successful_count': len(successful_results),
             'failed_count': len(failed_results),
+            'skipped_resolutions': metadata['skipped'],
             'results': results,
             'processing_time_ms': round(processing_time_ms, 2),
-            'timestamp': datetime.now().isoformat()
+            'timestamp': now_iso()
         }
 
         # Return appropriate status code
@@ -770,25 +1838,28 @@ def detect_objects_batch():
             if len(successful_results) > 0:
                 # Partial failure
                 print(f"[WARN] Partial failure: {len(successful_results)}/{len(results)} succeeded")
-                return jsonify(response), 207  # Multi-Status
+                return json_response(response, 207)  # Multi-Status
             else:
                 # Complete failure
                 print(f"[ERROR] Complete failure: all {len(results)} resolutions failed")
-                return jsonify(response), 500
+                return json_response(response, 500)
         else:
             # Complete success
-            print(f"[INFO] Cluster batch complete: {processing_time_ms:.0f}ms for {len(results)} resolutions")
-            return jsonify(response), 200
+            if VERBOSE_LOGGING:
+                print(f"[INFO] Cluster batch complete: {processing_time_ms:.0f}ms for {len(results)} resolutions")
+            return json_response(response, 200)
 
+    except RequestEntityTooLarge:
+        raise  # answered as JSON 413 by request_too_large
     except Exception as e:
         processing_time_ms = (time.time() - start_time) * 1000
         print(f"[ERROR] Cluster batch endpoint error: {str(e)}")
-        return jsonify({
+        return json_response({
             'success': False,
             'error': str(e),
             'processing_time_ms': round(processing_time_ms, 2),
-            'timestamp': datetime.now().isoformat()
-        }), 500
+            'timestamp': now_iso()
+        }, 500)
 
 @app.route('/detect/<resolution>', methods=['POST'])
 @cross_origin(origin="*")
@@ -798,161 +1869,331 @@ def detect_resolution_specific(resolution):
     Endpoints: /detect/256p, /detect/720p, /detect/1080p
     Expects: multipart/form-data with image file (any field name, already resized by upstream)
     Optional: 'topic' form field for source topic identification
-    Returns: Annotated image as PNG with indexed filename
+    Optional: '?format=jpeg' (with '&quality=1-100') for a libjpeg-turbo JPEG instead of PNG
+    Optional: '?annotate=0' to return JSON detections without rendering or encoding an image
+    Returns: Annotated image as PNG (or JPEG) with indexed filename
     """
     try:
         # Validate resolution
         if resolution not in RESOLUTIONS:
-            return jsonify({
+            return json_response({
                 'error': f'Invalid resolution: {resolution}',
                 'valid_resolutions': list(RESOLUTIONS.keys())
-            }), 400
+            }, 400)
 
         # Get the first file from request (accepts any field name)
         if not request.files:
-            return jsonify({'error': 'No image file provided'}), 400
+            return json_response({'error': 'No image file provided'}, 400)
 
         # Get first uploaded file regardless of field name
         file = next(iter(request.files.values()))
         if file.filename == '':
-            return jsonify({'error': 'No selected file'}), 400
+            return json_response({'error': 'No selected file'}, 400)
 
         # Get optional topic parameter
         source_topic = request.form.get('topic', 'direct_upload')
 
         # Read file bytes
-        file_bytes = file.read()
+        file_bytes = read_upload(file)
 
         # Validate image size
         try:
             validate_image_size(file_bytes)
         except ValueError as e:
-            return jsonify({'error': str(e)}), 413  # Payload Too Large
+            return json_response({'error': str(e)}, 413)  # Payload Too Large
 
         # Decode image (already at target resolution from upstream)
-        np_arr = np.frombuffer(file_bytes, np.uint8)
-        img_data = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
+        img_data = decode_upload(file, file_bytes)
 
         if img_data is None:
-            return jsonify({'error': 'Failed to decode image'}), 400
+            return json_response({'error': 'Failed to decode image'}, 400)
 
         height, width = img_data.shape[:2]
 
+        # JPEG responses are several times cheaper to encode than PNG
+        as_jpeg = request.args.get('format', OUTPUT_FORMAT).lower() in ('jpeg', 'jpg')
+        quality = min(max(request.args.get('quality', JPEG_QUALITY, type=int), 1), 100)
+
         # Generate indexed filename
-        indexed_filename = generate_indexed_filename(resolution)
+        indexed_filename = generate_indexed_filename(resolution, ext='.jpg' if as_jpeg else '.png')
 
         # Perform object detection on image as-is (no resizing)
-        results = model(
-            img_data,
-            conf=CONFIDENCE_THRESHOLD,
-            iou=IOU_THRESHOLD,
-            max_det=MAX_DETECTIONS,
-            verbose=False
-        )
+        results = run_inference([img_data])
 
         # Process detection results
-        detections = []
         result = results[0]
+        detections = extract_detections(result)
 
-        for box in result.boxes:
-            x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-            confidence = float(box.conf[0].cpu().numpy())
-            class_id = int(box.cls[0].cpu().numpy())
-            class_name = model.names[class_id]
-
-            detections.append({
-                'class': class_name,
-                'class_id': class_id,
-                'confidence': confidence,
-                'bbox': {
-                    'x1': float(x1),
-                    'y1': float(y1),
-                    'x2': float(x2),
-                    'y2': float(y2)
-                }
-            })
+        # Database row (if enabled); annotated_image is filled in once the image is encoded
+        db_row = {
+            'filename': file.filename,
+            'indexed_filename': indexed_filename,
+            'resolution': resolution,
+            'detection_count': len(result.boxes),
+            'detections': detections,
+            'annotated_image': None,
+            'image_width': width,
+            'image_height': height
+        }
+
+        if request.args.get('annotate', '1') == '0':
+            # Detections only: render the frame just for outputstreaming, skip the image response
+            if SEND_TO_OUTPUTSTREAMING:
+                send_frame_to_outputstreaming(draw_detections(result), resolution, source_topic)
+            # The row is still stored, without an image, so indexed_filename resolves to it
+            if ENABLE_DB_STORAGE:
+                detection_writer.submit([db_row])
+            return json_response({
+                'success': True,
+                'timestamp': now_iso(),
+                'resolution': resolution,
+                'indexed_filename': indexed_filename,
+                'image_dimensions': {
+                    'width': width,
+                    'height': height
+                },
+                'detection_count': len(result.boxes),
+                'detections': detections
+            }, 200)
 
         # Generate annotated image
-        annotated_img = result.plot()
+        annotated_img = draw_detections(result)
 
         # Send to outputstreaming with resolution and topic
         send_frame_to_outputstreaming(annotated_img, resolution, source_topic)
 
-        # Encode annotated image as PNG
-        _, img_encoded = cv2.imencode('.png', annotated_img)
-        img_bytes = img_encoded.tobytes()
+        # Encode annotated image as PNG, or JPEG when requested
+        if as_jpeg:
+            img_bytes = encode_jpeg(annotated_img, quality)
+        else:
+            _, img_encoded = cv2.imencode('.png', annotated_img)
+            img_bytes = img_encoded.tobytes()
 
         # Store in database (if enabled)
         if ENABLE_DB_STORAGE:
-            try:
-                detection_record = DetectionResult(
-                    filename=file.filename,
-                    indexed_filename=indexed_filename,
-                    resolution=resolution,
-                    detection_count=len(detections),
-                    detections=detections,
-                    annotated_image=img_bytes,
-                    image_width=width,
-                    image_height=height
-                )
-                db.session.add(detection_record)
-                db.session.commit()
-                print(f"[INFO] Stored detection result in DB (ID: {detection_record.id}, filename: {indexed_filename})")
-            except Exception as db_error:
-                print(f"[WARN] Failed to store in DB: {str(db_error)}")
-                db.session.rollback()
-                # Continue without failing
-        else:
+            db_row['annotated_image'] = img_bytes
+            detection_writer.submit([db_row])
+        elif VERBOSE_LOGGING:
             print(f"[INFO] Database storage disabled - frame forwarded to outputstreaming only")
 
-        # Return annotated image with indexed filename
-        return send_file(
-            io.BytesIO(img_bytes),
-            mimetype='image/png',
-            as_attachment=False,
-            download_name=indexed_filename
-        )
+        # Return annotated image with indexed filename (bytes directly, no send_file() file wrapper)
+        response = Response(img_bytes, status=200, mimetype='image/jpeg' if as_jpeg else 'image/png')
+        response.headers.set('Content-Disposition', 'inline', filename=indexed_filename)
+        return response
 
+    except RequestEntityTooLarge:
+        raise  # answered as JSON 413 by request_too_large
     except Exception as e:
-        return jsonify({
+        return json_response({
             'success': False,
             'error': str(e),
-            'timestamp': datetime.now().isoformat()
-        }), 500
+            'timestamp': now_iso()
+        }, 500)
+
+# /info only describes the loaded model and startup configuration, so its body is serialized once
+INFO_BODY = orjson.dumps({
+    'model': 'YOLO12-nano',
+    # Loaded artifact: .pt, TensorRT engine (<weights>-<precision>-b<batch>-sm<arch>.engine) or OpenVINO dir
+    'model_file': os.path.basename(str(model.model_name)),
+    'num_classes': len(model.names),
+    'classes': model.names,
+    'resolutions': list(RESOLUTIONS.keys()),
+    'configuration': {
+        'confidence_threshold': CONFIDENCE_THRESHOLD,
+        'iou_threshold': IOU_THRESHOLD,
+        'max_detections': MAX_DETECTIONS
+    }
+}, option=ORJSON_OPTIONS)
 
 @app.route('/info', methods=['GET'])
 def model_info():
     """Get information about the model and available classes"""
-    return jsonify({
-        'model': 'YOLO12-nano',
-        'num_classes': len(model.names),
-        'classes': model.names,
-        'resolutions': list(RESOLUTIONS.keys()),
-        'configuration': {
-            'confidence_threshold': CONFIDENCE_THRESHOLD,
-            'iou_threshold': IOU_THRESHOLD,
-            'max_detections': MAX_DETECTIONS
-        }        }), 200
+    response = Response(INFO_BODY, status=200, mimetype='application/json')
+    # Short max-age: the body only changes when a redeploy loads different weights or thresholds
+    response.headers['Cache-Control'] = 'public, max-age=300'
+    return response
 
 # Database model for storing detection results (optional - only used if ENABLE_DB_STORAGE=true)
-class DetectionResult(db.Model):
-    __tablename__ = 'detection_results'
-    id = db.Column(db.Integer, primary_key=True)
-    filename = db.Column(db.String(255))  # Original uploaded filename
-    indexed_filename = db.Column(db.String(300))  # Generated indexed filename
-    resolution = db.Column(db.String(10))  # Resolution label (256p, 720p, 1080p)
-    detection_count = db.Column(db.Integer)
-    detections = db.Column(db.JSON)  # Store detection data as JSON
-    annotated_image = db.Column(db.LargeBinary)  # Store annotated image as binary
-    image_width = db.Column(db.Integer)
-    image_height = db.Column(db.Integer)
-    created_at = db.Column(db.DateTime, server_default=db.func.now())
+if ENABLE_DB_STORAGE:
+    from sqlalchemy.dialects.postgresql import JSONB
+
+    class DetectionResult(db.Model):
+        __tablename__ = 'detection_results'
+        # Same indexes as db/migrations (001 and 002), so tables created by SQLAlchemy match migrated ones
+        __table_args__ = (
+            db.Index('idx_detection_results_created_at', db.desc('created_at')),
+            db.Index('idx_detection_results_filename', 'filename'),
+            db.Index('idx_detection_results_count', 'detection_count'),
+            db.Index('idx_detection_results_indexed_filename', 'indexed_filename'),
+            db.Index('idx_detection_results_resolution', 'resolution'),
+            db.Index('idx_detection_results_resolution_created', 'resolution', db.desc('created_at')),
+        )
+        id = db.Column(db.Integer, primary_key=True)
+        filename = db.Column(db.String(255))  # Original uploaded filename
+        indexed_filename = db.Column(db.String(300))  # Generated indexed filename
+        resolution = db.Column(db.String(10))  # Resolution label (256p, 720p, 1080p)
+        detection_count = db.Column(db.Integer)
+        detections = db.Column(db.JSON().with_variant(JSONB(), 'postgresql'))  # JSONB, as created by db/migrations
+        annotated_image = db.Column(db.LargeBinary)  # Store annotated image as binary
+        annotated_image_uri = db.Column(db.String(512))  # File path when IMAGE_STORE_DIR is set
+        image_width = db.Column(db.Integer)
+        image_height = db.Column(db.Integer)
+        created_at = db.Column(db.DateTime, server_default=db.func.now())
+else:
+    DetectionResult = None
+
+class DetectionWriter:
+    """
+    Persist detection rows off the request path
 
+    Request threads queue row dicts and return immediately. A background
+    thread collects rows for up to linger_ms (or until max_rows are queued)
+    and writes them with one multi-row INSERT and commit, so requests share
+    transactions. When the queue is full (database slower than the request
+    rate) the caller writes its rows synchronously instead of dropping them.
+    """
+
+    def __init__(self, max_rows, max_pending, linger_ms):
+        self.max_rows = max_rows
+        self.linger = linger_ms / 1000.0
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.thread = None
+        self.start_lock = threading.Lock()
+        self.next_prune = 0.0
+
+    def submit(self, rows):
+        """
+        Queue rows for insertion into detection_results
+
+        Args:
+            rows (list): Column dicts for DetectionResult
+        """
+        self._ensure_started()
+        try:
+            self.queue.put_nowait(rows)
+        except queue.Full:
+            print(f"[WARN] DB write queue full, storing {len(rows)} rows synchronously")
+            self._write(rows)
+
+    def _ensure_started(self):
+        # Started lazily so the thread always lives in the serving process
+        if self.thread is None:
+            with self.start_lock:
+                if self.thread is None:
+                    self.thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+                    self.thread.start()
+
+    def _run(self):
+        with app.app_context():
+            while True:
+                rows = list(self.queue.get())
+                deadline = time.monotonic() + self.linger
+                while len(rows) < self.max_rows:
+                    remaining = deadline - time.monotonic()
+                    try:
+                        rows.extend(self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait())
+                    except queue.Empty:
+                        break
+                self._write(rows)
+                if DB_RETENTION_HOURS > 0 and time.monotonic() >= self.next_prune:
+                    self._prune()
+                    self.next_prune = time.monotonic() + DB_PRUNE_INTERVAL_S
+                db.session.remove()
+
+    def _store_images(self, rows):
+        """
+        Move annotated image bytes out of rows into files under IMAGE_STORE_DIR
+
+        Args:
+            rows (list): Row dicts; annotated_image is replaced by annotated_image_uri
+
+        Returns:
+            list: Paths of the files written
+        """
+        written = []
+        for row in rows:
+            img_bytes = row.pop('annotated_image', None)
+            row['annotated_image_uri'] = None
+            if img_bytes is None:
+                continue
+            path = os.path.join(IMAGE_STORE_DIR, row['resolution'], row['indexed_filename'])
+            try:
+                with open(path, 'wb') as f:
+                    f.write(img_bytes)
+                row['annotated_image_uri'] = path
+                written.append(path)
+            except OSError as e:
+                print(f"[ERROR] Failed to store image {path}: {str(e)}")
+        return written
+
+    @staticmethod
+    def _remove_files(paths):
+        for path in paths:
+            if path:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass  # already gone
+
+    def _prune(self):
+        """
+        Delete rows older than DB_RETENTION_HOURS, and their files under IMAGE_STORE_DIR
+
+        Deletes DB_PRUNE_BATCH rows per transaction until none are left, so a
+        large backlog never becomes one long-running DELETE.
+        """
+        expired = db.select(DetectionResult.id).where(
+            DetectionResult.created_at < db.func.now() - timedelta(hours=DB_RETENTION_HOURS)
+        ).limit(DB_PRUNE_BATCH).scalar_subquery()
+        stmt = db.delete(DetectionResult).where(DetectionResult.id.in_(expired))
+        total = 0
+        try:
+            while True:
+                if IMAGE_STORE_DIR:
+                    paths = db.session.execute(stmt.returning(DetectionResult.annotated_image_uri)).scalars().all()
+                    deleted = len(paths)
+                else:
+                    paths = []
+                    deleted = db.session.execute(stmt).rowcount
+                db.session.commit()
+                self._remove_files(paths)
+                total += deleted
+                if deleted < DB_PRUNE_BATCH:
+                    break
+        except Exception as db_error:
+            print(f"[ERROR] Failed to prune old detection results: {str(db_error)}")
+            db.session.rollback()
+        if total and VERBOSE_LOGGING:
+            print(f"[INFO] Pruned {total} detection results older than {DB_RETENTION_HOURS:g}h")
+
+    def _write(self, rows):
+        written = []
+        try:
+            if IMAGE_STORE_DIR:
+                written = self._store_images(rows)
+            db.session.execute(db.insert(DetectionResult), rows)
+            db.session.commit()
+            if VERBOSE_LOGGING:
+                print(f"[INFO] Stored {len(rows)} detection results in DB")
+        except Exception as db_error:
+            print(f"[ERROR] Failed to store in DB: {str(db_error)}")
+            db.session.rollback()
+            # No row references these files, so retention pruning would never delete them
+            self._remove_files(written)
+
+detection_writer = DetectionWriter(DB_WRITE_BATCH, DB_WRITE_QUEUE, DB_WRITE_LINGER_MS) if ENABLE_DB_STORAGE else None
+
+if ENABLE_DB_STORAGE and IMAGE_STORE_DIR:
+    for resolution in RESOLUTIONS:
+        os.makedirs(os.path.join(IMAGE_STORE_DIR, resolution), exist_ok=True)
+
+# Development server only - production runs under Gunicorn (see gunicorn.conf.py)
 if __name__ == '__main__':
     port = int(os.getenv('PORT', '8000'))
     print(f"Starting Object Detection Server on port {port}")
     print(f"Confidence Threshold: {CONFIDENCE_THRESHOLD}")
     print(f"IOU Threshold: {IOU_THRESHOLD}")
+    inference_batcher.warm_up()
     app.run(host='0.0.0.0', port=port, debug=False)
 
 
@@ -0,0 +1,58 @@
+"""
+Tests for /detect/<resolution>
+
+The server reads its configuration at import time, so the environment is set
+before importing it. DB storage is enabled without a database: rows are
+captured at detection_writer.submit, which never connects.
+"""
+
+import io
+import os
+import sys
+
+import cv2
+import numpy as np
+import pytest
+
+os.environ['ENABLE_DB_STORAGE'] = 'true'
+os.environ['SEND_TO_OUTPUTSTREAMING'] = 'false'
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import server  # noqa: E402
+
+
+@pytest.fixture
+def submitted_rows(monkeypatch):
+    rows = []
+    monkeypatch.setattr(server.detection_writer, 'submit', rows.extend)
+    return rows
+
+
+def post_frame(query=''):
+    frame = cv2.imencode('.jpg', np.zeros((480, 640, 3), np.uint8))[1].tobytes()
+    client = server.app.test_client()
+    return client.post(
+        f'/detect/720p{query}',
+        data={'image': (io.BytesIO(frame), 'frame.jpg')},
+        content_type='multipart/form-data'
+    )
+
+
+def test_annotate_off_still_stores_row(submitted_rows):
+    response = post_frame('?annotate=0')
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert len(submitted_rows) == 1
+    row = submitted_rows[0]
+    assert row['indexed_filename'] == body['indexed_filename']
+    assert row['detection_count'] == body['detection_count']
+    assert row['annotated_image'] is None
+
+
+def test_annotated_response_stores_image(submitted_rows):
+    response = post_frame('?format=jpeg')
+
+    assert response.status_code == 200
+    assert len(submitted_rows) == 1
+    assert submitted_rows[0]['annotated_image'] == response.data